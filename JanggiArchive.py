@@ -0,0 +1,354 @@
+# -----------------------------------------------------------------#
+# Description: A binary file format for storing many JanggiGame games, with a writer and a reader. Moves are
+#              stored packed (see JanggiGame.encode_move), two bytes each, and the reader maps the file into memory
+#              and reads one game at a time, so large archives can be scanned without loading them.
+#
+#              Layout, all numbers little endian:
+#                header   magic b'JANGGI', version (2 bytes), number of games (8 bytes), offset of the index
+#                         (8 bytes, 0 if the writer was not closed)
+#                games    for each game the number of moves (2 bytes), the result (1 byte, a RESULTS index) and
+#                         the packed moves (2 bytes each)
+#                index    the offset of each game's record (8 bytes each), for going straight to a game by number
+#
+#              Run with: python JanggiArchive.py [--games N] [--plies N] to time writing and reading random games.
+# -----------------------------------------------------------------#
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from collections import namedtuple
+
+from JanggiGame import move_to_algebraic, parse_transcript
+
+MAGIC = b"JANGGI"
+VERSION = 1
+
+_HEADER = struct.Struct("<6sHQQ")
+_RECORD = struct.Struct("<HB")
+_OFFSET = struct.Struct("<Q")
+
+# the game states a result byte stands for
+RESULTS = ("UNFINISHED", "BLUE_WON", "RED_WON")
+
+# while iterating, the pages already read are handed back to the system every this many bytes, so reading through a
+# large archive does not keep all of it in memory
+_RELEASE_BYTES = 1 << 22
+
+# a game read from an archive, its number in the archive, its game state and an array('H') of its packed moves
+GameRecord = namedtuple("GameRecord", "game_id game_state moves")
+
+
+def _little_endian(moves):
+    '''
+    Returns the bytes of an array('H') of moves in little endian order whatever the machine's order is.
+    '''
+
+    if sys.byteorder == "big":
+        moves = array('H', moves)
+        moves.byteswap()
+
+    return moves.tobytes()
+
+
+class ArchiveWriter:
+    '''
+    Writes games to a new archive file one at a time. The index and the number of games go in when the writer is
+    closed, which happens on leaving a with block.
+    '''
+
+    def __init__(self, path):
+        '''
+        The init method for the writer that creates the file and writes a header for an unfinished archive.
+
+        Receives: the path of the file, which is replaced if it exists
+        Returns: none
+        '''
+
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        self._offsets = array('Q')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, moves, game_state="UNFINISHED"):
+        '''
+        Adds a game to the archive.
+
+        Receives: the game's packed moves (such as JanggiGame.get_move_history() or parse_transcript) and its game
+        state as a default parameter. Raises ValueError for an unknown game state or more than 65535 moves.
+
+        Returns: the game's number in the archive, counting from 0
+        '''
+
+        if game_state not in RESULTS:
+            raise ValueError("unknown game state " + repr(game_state))
+
+        if not isinstance(moves, array) or moves.typecode != 'H':
+            moves = array('H', moves)
+
+        if len(moves) > 0xFFFF:
+            raise ValueError("a game can have at most 65535 moves")
+
+        self._offsets.append(self._file.tell())
+        self._file.write(_RECORD.pack(len(moves), RESULTS.index(game_state)))
+        self._file.write(_little_endian(moves))
+
+        return len(self._offsets) - 1
+
+    def close(self):
+        '''
+        Writes the index and the finished header and closes the file. Does nothing if it is already closed.
+
+        Receives: none
+        Returns: none
+        '''
+
+        if self._file.closed:
+            return
+
+        index_offset = self._file.tell()
+
+        for offset in self._offsets:
+            self._file.write(_OFFSET.pack(offset))
+
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, len(self._offsets), index_offset))
+        self._file.close()
+
+
+class ArchiveReader:
+    '''
+    Reads an archive by mapping the file into memory, so only the parts that are read are loaded. Iterating gives
+    the games in order, and get_game goes straight to one game through the index.
+    '''
+
+    def __init__(self, path):
+        '''
+        The init method for the reader that maps the file and checks the header.
+
+        Receives: the path of the archive. Raises ValueError if the file is not an archive of this version, or its
+        index does not fit in it, as when the file was cut short, or, with no index, a game record runs past its end.
+        Returns: none
+        '''
+
+        with open(path, "rb") as archive:
+            self._map = mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError(path + " is not a game archive")
+
+        magic, version, count, index_offset = _HEADER.unpack_from(self._map, 0)
+
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(path + " is not a version " + str(VERSION) + " game archive")
+
+        # an archive whose writer was not closed has no index, so its games are found by reading through it
+        if index_offset == 0:
+            index_offset = len(self._map)
+
+            try:
+                count = sum(1 for offset in self._scan(index_offset))
+            except ValueError as error:
+                self._map.close()
+                raise ValueError(path + " is cut short or corrupt: " + str(error))
+
+        elif index_offset < _HEADER.size or index_offset + count * _OFFSET.size > len(self._map):
+            size = len(self._map)
+            self._map.close()
+            raise ValueError(path + " is cut short or corrupt, its index of " + str(count) + " games at byte " +
+                             str(index_offset) + " does not fit in its " + str(size) + " bytes")
+
+        self._count = count
+        self._index_offset = index_offset
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        released = 0
+
+        if hasattr(self._map, "madvise"):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+        # an archive with an index is read through it, so a corrupt record can not hide the games after it
+        if self._index_offset == len(self._map):
+            offsets = self._scan(self._index_offset)
+        else:
+            offsets = (_OFFSET.unpack_from(self._map, self._index_offset + _OFFSET.size * game_id)[0]
+                       for game_id in range(self._count))
+
+        game_id = -1
+
+        for game_id, offset in enumerate(offsets):
+            yield self._read(game_id, offset)
+
+            if offset - released >= _RELEASE_BYTES and hasattr(mmap, "MADV_DONTNEED"):
+                done = offset - offset % mmap.PAGESIZE
+                self._map.madvise(mmap.MADV_DONTNEED, released, done - released)
+                released = done
+
+        if game_id + 1 != self._count:
+            raise ValueError("read " + str(game_id + 1) + " games from an archive of " + str(self._count))
+
+    def _scan(self, end):
+        '''
+        Yields the offset of each game record from the header up to end. Raises ValueError if a record runs past end.
+        '''
+
+        offset = _HEADER.size
+
+        while offset < end:
+            if offset + _RECORD.size > end:
+                raise ValueError("the game record at byte " + str(offset) + " runs past the games")
+
+            length, result = _RECORD.unpack_from(self._map, offset)
+
+            if offset + _RECORD.size + 2 * length > end:
+                raise ValueError("the game record at byte " + str(offset) + " runs past the games")
+
+            yield offset
+            offset += _RECORD.size + 2 * length
+
+    def _read(self, game_id, offset):
+        '''
+        Reads the game record at an offset. Raises ValueError if the record is not one, as in a corrupt archive.
+        '''
+
+        if not _HEADER.size <= offset <= self._index_offset - _RECORD.size:
+            raise ValueError("game " + str(game_id) + " is at byte " + str(offset) + ", outside the games")
+
+        length, result = _RECORD.unpack_from(self._map, offset)
+        start = offset + _RECORD.size
+
+        if start + 2 * length > self._index_offset or result >= len(RESULTS):
+            raise ValueError("game " + str(game_id) + " at byte " + str(offset) + " is corrupt")
+
+        moves = array('H')
+        moves.frombytes(self._map[start:start + 2 * length])
+
+        if sys.byteorder == "big":
+            moves.byteswap()
+
+        return GameRecord(game_id, RESULTS[result], moves)
+
+    def get_game(self, game_id):
+        '''
+        Reads one game by its number.
+
+        Receives: the game's number, counting from 0. Raises IndexError if there is no such game, and ValueError if
+        its record is corrupt.
+        Returns: a GameRecord
+        '''
+
+        if not 0 <= game_id < self._count:
+            raise IndexError("no game " + str(game_id) + " in an archive of " + str(self._count))
+
+        if self._index_offset == len(self._map):
+            for offset_id, offset in enumerate(self._scan(self._index_offset)):
+                if offset_id == game_id:
+                    return self._read(game_id, offset)
+
+        offset, = _OFFSET.unpack_from(self._map, self._index_offset + _OFFSET.size * game_id)
+
+        return self._read(game_id, offset)
+
+    def close(self):
+        '''
+        Unmaps the file.
+
+        Receives: none
+        Returns: none
+        '''
+
+        self._map.close()
+
+
+# ---------------------------BENCHMARK-------------------------#
+
+def main(argv=None):
+    '''
+    The command line entry point. Writes random games to an archive and to a text file of make_move calls, and prints
+    the sizes and the time to write and read each.
+
+    Receives: the command line arguments, the ones the program was run with if none
+    Returns: 0, or 1 if the games read back differ from the ones written
+    '''
+
+    # only there on unix, and only needed here
+    import resource
+
+    from JanggiReplay import random_game
+
+    parser = argparse.ArgumentParser(description="Time the JanggiGame game archive format.")
+    parser.add_argument("--games", type=int, default=300, help="random games to make up (default 300)")
+    parser.add_argument("--plies", type=int, default=80, help="longest random game (default 80)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random games (default 0)")
+    args = parser.parse_args(argv)
+
+    generator = random.Random(args.seed)
+    games = [parse_transcript(random_game(generator, args.plies)) for game in range(args.games)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive_path = os.path.join(directory, "games.jga")
+        text_path = os.path.join(directory, "games.txt")
+
+        start = time.perf_counter()
+
+        with ArchiveWriter(archive_path) as writer:
+            for moves in games:
+                writer.write(moves)
+
+        write_seconds = time.perf_counter() - start
+
+        # the same games as make_move calls, one per line
+        with open(text_path, "w") as text:
+            for moves in games:
+                text.write(" ".join("make_move('%s', '%s')" % move_to_algebraic(move) for move in moves) + "\n")
+
+        start = time.perf_counter()
+
+        with ArchiveReader(archive_path) as reader:
+            read_back = [record.moves for record in reader]
+            middle = reader.get_game(len(reader) // 2).moves
+
+        read_seconds = time.perf_counter() - start
+
+        archive_size = os.path.getsize(archive_path)
+        text_size = os.path.getsize(text_path)
+
+    moves_written = sum(len(moves) for moves in games)
+
+    print("%d games, %d moves" % (len(games), moves_written))
+    print("archive  %9d bytes  %.2f bytes/move  written in %.3f s  read in %.3f s (%.0f games/s)"
+          % (archive_size, archive_size / moves_written, write_seconds, read_seconds, len(games) / read_seconds))
+    print("text     %9d bytes  %.2f bytes/move  %.1fx the archive"
+          % (text_size, text_size / moves_written, text_size / archive_size))
+    print("max rss  %9d KB" % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+    if read_back != games or middle != games[len(games) // 2]:
+        print("games read back differ from the ones written")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+# -----------------------------------------------------------------#
+# Description: Micro benchmarks for JanggiGame -- making moves, testing for check and checkmate, listing the
+#              occupied squares, setting up a game and each piece type's check_moves, on fixed positions. Each
+#              benchmark is timed with timeit and the best of several runs is kept, in microseconds a call. Results
+#              can be saved as a JSON baseline and later runs compared against it, failing when a benchmark got
+#              slower than the threshold allows, so a change that slows the game down is caught before it ships.
+#
+#              Run with: python JanggiBench.py [--save FILE] [--compare FILE] [--threshold F] [--repeat N]
+#                                              [--filter TEXT]
+# -----------------------------------------------------------------#
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+from JanggiGame import JanggiGame, Board, ALGEBRAIC, COORDS, PIECE_NAMES, opposite
+from JanggiPerft import load_position
+
+BASELINE_VERSION = 1
+
+# positions from JanggiPerft to time on. cannon_check has red in check, so its checkmate test has to search for a way
+# out instead of stopping at the check test.
+POSITIONS = ("opening", "middlegame", "cannon_check")
+
+
+def _make_move_benchmark(position):
+    '''
+    Makes and takes back each legal piece move of the position in turn.
+    '''
+
+    game = load_position(position)
+    moves = [(move_from, move_to) for move_from, move_to in game.legal_moves(game.get_players_turn())
+             if move_from != move_to]
+    state = {"next": 0}
+
+    def make_move():
+        move_from, move_to = moves[state["next"]]
+        state["next"] = (state["next"] + 1) % len(moves)
+        game.make_move(move_from, move_to)
+        game.undo()
+
+    return make_move
+
+
+def _refused_move_benchmark(position):
+    '''
+    Tries a move the game refuses, a piece of the player to move onto one of its own pieces.
+    '''
+
+    game = load_position(position)
+    board = game.get_board()
+    own = sorted(row * 9 + col for row, col in board.get_squares(game.get_players_turn()))
+    move_from = ALGEBRAIC[own[0]]
+    move_to = ALGEBRAIC[own[1]]
+
+    return lambda: game.make_move(move_from, move_to)
+
+
+def _check_moves_benchmarks(position):
+    '''
+    One benchmark for each piece type the player to move has, calling check_moves for the first piece of the type.
+    '''
+
+    game = load_position(position)
+    board = game.get_board()
+    color = game.get_players_turn()
+    capturable = board.get_squares(opposite(color))
+    benchmarks = {}
+
+    for piece_name in PIECE_NAMES:
+        pieces = board.get_bitboard(color, piece_name)
+
+        if not pieces:
+            continue
+
+        row, col = COORDS[(pieces & -pieces).bit_length() - 1]
+        piece = board.get_piece(row, col)
+
+        def check_moves(piece=piece, row=row, col=col):
+            piece.check_moves(row, col, board, color, capturable)
+
+        benchmarks["check_moves." + piece_name + "." + position] = check_moves
+
+    return benchmarks
+
+
+def make_benchmarks():
+    '''
+    Sets up every benchmark.
+
+    Receives: none
+    Returns: a dictionary of benchmark name : function to time
+    '''
+
+    benchmarks = {
+        "construct.JanggiGame": JanggiGame,
+        "construct.create_board": lambda: Board().create_board(),
+    }
+
+    for position in POSITIONS:
+        game = load_position(position)
+        color = game.get_players_turn()
+
+        benchmarks["make_move." + position] = _make_move_benchmark(position)
+        benchmarks["make_move_refused." + position] = _refused_move_benchmark(position)
+        benchmarks["is_in_check." + position] = lambda game=game, color=color: game.is_in_check(color)
+        benchmarks["is_in_checkmate." + position] = lambda game=game, color=color: game.is_in_checkmate(color)
+        benchmarks["get_occupied." + position] = game.get_board().get_occupied
+        benchmarks["iter_occupied." + position] = lambda board=game.get_board(): list(board.iter_occupied())
+
+    benchmarks.update(_check_moves_benchmarks("middlegame"))
+
+    return benchmarks
+
+
+def run_benchmarks(name_filter=None, repeat=5):
+    '''
+    Times the benchmarks.
+
+    Receives: as default parameters text a benchmark's name has to contain to be run, and how many times each one is
+    timed, the best time being kept
+    Returns: a dictionary of benchmark name : microseconds a call
+    '''
+
+    results = {}
+
+    for name, function in sorted(make_benchmarks().items()):
+        if name_filter and name_filter not in name:
+            continue
+
+        timer = timeit.Timer(function)
+        number, seconds = timer.autorange()
+        best = min([seconds] + timer.repeat(repeat - 1, number))
+
+        results[name] = best / number * 1e6
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    '''
+    Compares results against a baseline.
+
+    Receives: the results and the baseline's results, as run_benchmarks gives them, and the slowdown allowed as a
+    fraction, such as 0.3 for 30% slower
+    Returns: a list of (name, baseline microseconds, microseconds, ratio) for the benchmarks slower than allowed
+    '''
+
+    regressions = []
+
+    for name, microseconds in sorted(results.items()):
+        if name not in baseline:
+            continue
+
+        ratio = microseconds / baseline[name]
+
+        if ratio > 1 + threshold:
+            regressions.append((name, baseline[name], microseconds, ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    '''
+    The command line entry point. Runs the benchmarks and prints them, saving them as a baseline with --save and
+    comparing them against one with --compare.
+
+    Receives: the command line arguments, the ones the program was run with if none
+    Returns: 0, or 1 with --compare when a benchmark got slower than the threshold allows
+    '''
+
+    parser = argparse.ArgumentParser(description="Micro benchmarks for JanggiGame with stored baselines.")
+    parser.add_argument("--save", metavar="FILE", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare the results against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="slowdown allowed against the baseline as a fraction (default 0.3, 30%% slower)")
+    parser.add_argument("--repeat", type=int, default=5, help="times each benchmark is timed (default 5)")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    args = parser.parse_args(argv)
+
+    baseline = None
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            stored = json.load(baseline_file)
+
+        if stored.get("version") != BASELINE_VERSION:
+            print(args.compare + " is not a version " + str(BASELINE_VERSION) + " baseline")
+            return 1
+
+        baseline = stored["results"]
+
+    results = run_benchmarks(args.filter, args.repeat)
+
+    for name, microseconds in results.items():
+        line = "%-40s %10.2f us" % (name, microseconds)
+
+        if baseline is not None:
+            if name in baseline:
+                line += "  baseline %10.2f us  %5.2fx" % (baseline[name], microseconds / baseline[name])
+            else:
+                line += "  not in baseline"
+
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as baseline_file:
+            json.dump({"version": BASELINE_VERSION, "python": platform.python_version(),
+                       "machine": platform.machine(), "results": results}, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+
+        print("saved " + str(len(results)) + " results to " + args.save)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+
+        for name, before, after, ratio in regressions:
+            print("REGRESSION %s: %.2f us -> %.2f us (%.2fx)" % (name, before, after, ratio))
+
+        if regressions:
+            return 1
+
+        print("no benchmark more than %.0f%% slower than %s" % (args.threshold * 100, args.compare))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,359 +12,620 @@
 #              mechanisms for figuring out who can start the game.
 # -----------------------------------------------------------------#
 
-# ------------------------------PIECES-----------------------------------#
+import random
+import struct
+import sys
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from enum import Enum
+from time import perf_counter_ns
+from types import MappingProxyType
 
-class ChessPiece:
+# ------------------------------TABLES-----------------------------------#
+
+# squares are numbered row * 9 + col, so square 0 is a1 and square 89 is i10. the board keeps one bit per square
+# in its bitboards and the tables below are worked out once for every square so that move generation only has to
+# look things up instead of walking directions and testing board edges.
+
+EMPTY = "       "
+
+BOARD_ROWS = 10
+BOARD_COLS = 9
+BOARD_SQUARES = BOARD_ROWS * BOARD_COLS
+
+COORDS = tuple((square // BOARD_COLS, square % BOARD_COLS) for square in range(BOARD_SQUARES))
+ALGEBRAIC = tuple("abcdefghi"[col] + str(row + 1) for row, col in COORDS)
+
+
+def _square(row, col):
+    '''
+    Converts a row and column to a square number, or None if the coordinates are off the board.
     '''
-    The chess piece class which works for all the pieces, will need to communicate with the other piece classes
-    the JanggiGame class, and possibly the board class. It will need to do so so that pieces and
-    information from pieces can be accessed moves can be made within the game.
 
-    This class will setup the basics of the chess pieces to inherit from. It will determine possible moves,
-    possible captures, and whether a move is valid or not. It will also provide get methods for piece names and
-    color for players.
+    if 0 <= row < BOARD_ROWS and 0 <= col < BOARD_COLS:
+        return row * BOARD_COLS + col
+
+    return None
+
+
+def _palace_of(row, col):
+    '''
+    Returns the color of the palace the coordinates are in, or None if they are not in a palace.
     '''
 
-    def __init__(self, player, piece_name):
-        '''
-        init method for the chess piece class that will initialize the data members
+    if 3 <= col <= 5 and row <= 2:
+        return 'red'
 
-        Recieves: takes as parameter which player's piece is being moved and the name of the piece being moved.
-        Returns: nothing
-        '''
+    if 3 <= col <= 5 and row >= 7:
+        return 'blue'
 
-        self._player = player
-        self._piece_name = piece_name
+    return None
 
-        # basic directions for pieces to access
-        self._orth = ((1, 0), (0, 1), (-1, 0), (0, -1))
-        self._diag = ((-1, -1), (-1, 1), (1, -1), (1, 1))
 
-    def get_piece_name(self):
-        '''
-        Get method for the name of the piece located on the board. 
-        
-        Receives: none
-        Returns: the piece name
-        '''
+_ORTH = ((1, 0), (0, 1), (-1, 0), (0, -1))
+_DIAG = ((-1, -1), (-1, 1), (1, -1), (1, 1))
 
-        return self._piece_name
+# corners and centers of both palaces, the only points joined by the diagonal palace lines
+_PALACE_POINTS = {(0, 3), (0, 5), (2, 3), (2, 5), (7, 3), (7, 5), (9, 3), (9, 5), (1, 4), (8, 4)}
+_PALACE_CORNERS = {(0, 3), (0, 5), (2, 3), (2, 5), (7, 3), (7, 5), (9, 3), (9, 5)}
 
-    def get_player(self):
-        '''
-        Get method for the color of the player of the piece located on the board. 
+PALACE = tuple(_palace_of(row, col) for row, col in COORDS)
+PALACE_CENTER = {'red': _square(1, 4), 'blue': _square(8, 4)}
 
-        Receives: none
-        Returns: the player color of the selected piece
-        '''
-        
-        return self._player
 
+def _build_tables():
+    '''
+    Works out the movement tables for every square on the board.
 
-    def possible_moves(self, row_from, col_from, board, color, directions,
-                       capturable, x_distance=None, y_distance=None, palace=None):
-        '''
-        Method that detects the available moves a piece can make from their current location on the board. 
-        
-        Recieves: row and column, the board object, whose turn it is (color), piece direcitons, 
-        whether a move is able to capture another piece. It can also receive default parameters of 
-        the maximum row and column distance a piece can move, and the color of the palace the piece is located in.
-        
-        Returns: a list of coordinates in (y, x) -- row, column -- that a piece is allowed to move to
-        '''
-    
-        coords = []
-        occupied = board.get_occupied().values()
-        start = (row_from, col_from)
-        palace_corners = (0, 3), (0, 5), (2, 3), (2, 5), (7, 3), (7, 5), (9, 3), (9, 5)
-        palace_centers = (8, 4), (1, 4)
-        palace_directions = directions
-
-        # establishes way to retrieve the opposite color
-        if color == 'blue':
-            opposite_color = 'red'
+    Receives: none
+    Returns: a tuple of the orthogonal rays, palace steps, palace diagonal rays, horse steps, elephant steps,
+    soldier steps and cannon palace jumps, each indexed by square.
+    '''
 
-        if color == 'red':
-            opposite_color = 'blue'
+    orth_rays = []
+    palace_steps = []
+    palace_diagonal_rays = []
+    horse_steps = []
+    elephant_steps = []
+    soldier_steps = {'blue': [], 'red': []}
+    cannon_palace_jumps = []
 
-        current_is_in_palace = self.is_in_palace(row_from, col_from, palace)
+    for row, col in COORDS:
 
-        # special directions if certain pieces are located within the palace and in specific locations 
-        # that allow diagonal movement
-        
-        if current_is_in_palace and (self.get_piece_name() == "General" or self.get_piece_name() == "Guard" or \
-            self.get_piece_name() == "Chariot") and (start in palace_corners or start in palace_centers):
+        # orthogonal rays as (squares outward, mask of those squares, step between squares)
+        rays = []
 
-            palace_directions = self._diag + self._orth
+        for x_movement, y_movement in _ORTH:
+            ray = []
+            mask = 0
+            row_temp, col_temp = row + x_movement, col + y_movement
 
-        if current_is_in_palace and self.get_piece_name() == "Soldier" and \
-                (start in palace_corners or start in palace_centers):
+            while _square(row_temp, col_temp) is not None:
+                ray.append(_square(row_temp, col_temp))
+                mask |= 1 << _square(row_temp, col_temp)
+                row_temp, col_temp = row_temp + x_movement, col_temp + y_movement
 
-            if palace == 'red':
-                palace_directions = (0, -1), (0, 1), (-1, 0), (-1, -1), (-1, 1)
+            rays.append((tuple(ray), mask, x_movement * BOARD_COLS + y_movement))
 
-            if palace == 'blue':
-                palace_directions = (0, -1), (0, 1), (-1, 0), (1, 1), (-1, 1)
+        orth_rays.append(tuple(rays))
 
-        # determines available moves if the starting location is located within either the red or blue palace
-        if current_is_in_palace:
-            
-            for x_movement, y_movement in palace_directions:
-                collision = False
-                too_far = False
+        # palace lines -- orthogonal steps inside the palace, plus the diagonal lines from the corners and center
+        steps = []
+        diagonal_rays = []
+        palace = _palace_of(row, col)
 
-                row_temp, col_temp = row_from + x_movement, col_from + y_movement
+        if palace is not None:
+            directions = _ORTH
 
-                # while the attempted destination coordinates remain in the board and palace indices
-                while self.is_in_board(row_temp, col_temp) and self.is_in_palace(row_temp, col_temp, palace):
+            if (row, col) in _PALACE_POINTS:
+                directions = _DIAG + _ORTH
 
-                    destination = (row_temp, col_temp)
+            for x_movement, y_movement in directions:
+                ray = []
+                row_temp, col_temp = row + x_movement, col + y_movement
 
-                    # determines if the attempted move distance is too far allowed by piece movement rules
-                    if abs(row_from - row_temp) > y_distance:
-                        too_far = True
+                while _square(row_temp, col_temp) is not None and _palace_of(row_temp, col_temp) == palace:
+                    ray.append(_square(row_temp, col_temp))
+                    row_temp, col_temp = row_temp + x_movement, col_temp + y_movement
 
-                    if abs(col_from - col_temp) > x_distance:
-                        too_far = True
+                if ray:
+                    steps.append(ray[0])
 
-                    #  if the attempted move runs into another piece of the same color, break the loop
-                    if collision is True:
-                        break
+                    if (x_movement, y_movement) in _DIAG:
+                        diagonal_rays.append(tuple(ray))
 
-                    # special rules for the cannon piece that disallow diagonal movement if the center square
-                    # of the palace is not occupied
-                    if self.get_piece_name() == "Cannon" and palace == 'blue' and (8, 4) not in occupied:
-                        return False
+        palace_steps.append(tuple(steps))
+        palace_diagonal_rays.append(tuple(diagonal_rays))
 
-                    if self.get_piece_name() == "Cannon" and palace == 'red' and (1, 4) not in occupied:
-                        return False
+        # (blocking square, destination) for the horse and (first block, second block, destination) for the
+        # elephant. both move one point orthogonally and then outward diagonally.
+        horse = []
+        elephant = []
 
-                    # special directions for the cannon piece that allows for diagonal movement in the palace
-                    if self.get_piece_name() == "Cannon" and (8, 4) in occupied and start in palace_corners:
+        for x_movement, y_movement in _ORTH:
+            for side in (-1, 1):
 
-                        special_directions = (-2, -2), (2, 2), (-2, 2), (2, -2)
-                        obstructed_color = board.get_occupied(color).values()
+                if x_movement != 0:
+                    x_diagonal, y_diagonal = x_movement, side
+                else:
+                    x_diagonal, y_diagonal = side, y_movement
 
-                        for xx_movement, yy_movement in special_directions:
+                block = _square(row + x_movement, col + y_movement)
+                horse_to = _square(row + x_movement + x_diagonal, col + y_movement + y_diagonal)
+                elephant_to = _square(row + x_movement + 2 * x_diagonal, col + y_movement + 2 * y_diagonal)
 
-                            palace_row_temp = row_from + xx_movement
-                            palace_col_temp = col_from + yy_movement
-                            palace_destination = (palace_row_temp, palace_col_temp)
+                if horse_to is not None:
+                    horse.append((block, horse_to))
 
-                            # check that diagonal jump is in the board and is in the palace
-                            if self.is_in_board(row_temp, col_temp) and \
-                                self.is_in_palace(palace_row_temp, palace_col_temp, color) \
-                                    and destination not in obstructed_color:
+                if elephant_to is not None:
+                    elephant.append((block, horse_to, elephant_to))
 
-                                coords.append(palace_destination)
+        horse_steps.append(tuple(horse))
+        elephant_steps.append(tuple(elephant))
 
-                    # for all other pieces, tests that the attempted destination positions are not occupied 
-                    # and that the destination remains in the palace for unique palace movement of pieces
-                    if self.get_piece_name() != "Cannon" and destination not in occupied \
-                            and too_far is False and self.is_in_palace(row_temp, col_temp, color):
-                        coords.append(destination)
+        # one point sideways or forward, forward being up the board for blue and down for red
+        for color, forward in (('blue', -1), ('red', 1)):
+            steps = [_square(row + x_movement, col + y_movement)
+                     for x_movement, y_movement in ((0, -1), (0, 1), (forward, 0))]
 
-                    # if the attempted destination runs into a piece of the same color blocking it
-                    elif destination in board.get_occupied(color).values():
-                        collision = True
+            soldier_steps[color].append(tuple(step for step in steps if step is not None))
 
-                    else:
-                        if too_far is True and self.get_piece_name() != "Cannon":
-                            collision = True
+        # the opposite corner a cannon can jump to over the palace center, with the orthogonal palace points
+        # next to the corner
+        jump = None
 
-                    # increments row, col to be tested by given direction coordinates
-                    row_temp, col_temp = row_temp + x_movement, col_temp + y_movement
+        if (row, col) in _PALACE_CORNERS:
+            jump = (_square(row + (2 if row in (0, 7) else -2), col + (2 if col == 3 else -2)),
+                    tuple(step for step in palace_steps[-1] if COORDS[step][0] == row or COORDS[step][1] == col))
 
-        # tests available moves for positions outside the palace but within the board
-        for x_movement, y_movement in directions:
-            collision = False
+        cannon_palace_jumps.append(jump)
 
-            row_temp, col_temp = row_from + x_movement, col_from + y_movement
-            found_key = None
+    return (tuple(orth_rays), tuple(palace_steps), tuple(palace_diagonal_rays), tuple(horse_steps),
+            tuple(elephant_steps), {color: tuple(steps) for color, steps in soldier_steps.items()},
+            tuple(cannon_palace_jumps))
 
-            while self.is_in_board(row_temp, col_temp):
 
-                destination = (row_temp, col_temp)
+ORTH_RAYS, PALACE_STEPS, PALACE_DIAGONAL_RAYS, HORSE_STEPS, ELEPHANT_STEPS, SOLDIER_STEPS, \
+    CANNON_PALACE_JUMPS = _build_tables()
 
-                too_far = False
+# the same steps looked at backwards, the squares a piece could move to each square from. used to find attackers
+# of a square. (origin, blocking square) for the horse, (origin, first block, second block) for the elephant.
+HORSE_ORIGINS = tuple(tuple((origin, block) for origin in range(BOARD_SQUARES)
+                            for block, destination in HORSE_STEPS[origin] if destination == square)
+                      for square in range(BOARD_SQUARES))
 
-                if abs(row_from - row_temp) > y_distance:
-                    too_far = True
+ELEPHANT_ORIGINS = tuple(tuple((origin, first_block, second_block) for origin in range(BOARD_SQUARES)
+                               for first_block, second_block, destination in ELEPHANT_STEPS[origin]
+                               if destination == square)
+                         for square in range(BOARD_SQUARES))
 
-                if abs(col_from - col_temp) > x_distance:
-                    too_far = True
+SOLDIER_ORIGINS = {color: tuple(tuple(origin for origin in range(BOARD_SQUARES) if square in steps[origin])
+                                for square in range(BOARD_SQUARES))
+                   for color, steps in SOLDIER_STEPS.items()}
 
-                if collision is True:
-                    break
 
-                # gets piece name in order to give special instructions for the Cannon piece
-                for key, value in board.get_occupied().items():
-                    if destination == value:
-                        found_key = key
+# zobrist keys -- one random 64 bit number per color, piece type and square, and one for red being the side to move.
+# a position's hash is the xor of the keys of its pieces, so moving a piece only takes a couple of xors. drawn from a
+# fixed seed so every process gets the same keys.
+ZOBRIST_SEED = 0x4A414E474749
 
-                # rule that disallows the Cannon piece from moving without jumping over another piece,
-                # and rule that disallows the Cannon from jumping over another Cannon
-                if self.get_piece_name() == "Cannon" and destination in occupied and \
-                        found_key.get_piece_name() != "Cannon":
+PIECE_NAMES = ('General', 'Guard', 'Horse', 'Elephant', 'Chariot', 'Cannon', 'Soldier')
 
-                    first = row_temp + x_movement
-                    second = col_temp + y_movement
-                    jump_row = first
-                    jump_col = second
+# integer codes for the piece types, in the order of PIECE_NAMES. a piece's code is its color's offset plus its type,
+# which indexes the board's piece bitboards, the zobrist keys and the shared piece objects.
+GENERAL, GUARD, HORSE, ELEPHANT, CHARIOT, CANNON, SOLDIER = range(len(PIECE_NAMES))
+PIECE_TYPES = {piece_name: piece_type for piece_type, piece_name in enumerate(PIECE_NAMES)}
+COLOR_OFFSET = {'red': 0, 'blue': len(PIECE_NAMES)}
 
-                    while self.is_in_board(jump_row, jump_col):
-                        jump = (jump_row, jump_col)
 
-                        if jump not in occupied:
-                            coords.append(jump)
+def _build_zobrist_keys():
+    '''
+    Draws the zobrist keys from the fixed seed.
 
-                        if jump in capturable:
-                            coords.append(jump)
-                            break
+    Receives: none
+    Returns: a tuple of the keys by square for each piece code, and the red to move key
+    '''
 
-                        if jump in board.get_occupied(opposite_color).values():
-                            coords.append(jump)
-                            break  # - removed this to initiate cannon checkmate scenario
+    generator = random.Random(ZOBRIST_SEED)
+    piece_keys = []
 
-                        if jump in board.get_occupied(color).values():
-                            break
+    for color in ('red', 'blue'):
+        for piece_name in PIECE_NAMES:
+            piece_keys.append(tuple(generator.getrandbits(64) for square in range(BOARD_SQUARES)))
 
-                        jump_row, jump_col = jump_row + x_movement, jump_col + y_movement
+    return tuple(piece_keys), generator.getrandbits(64)
 
-                # for all other pieces aside from the cannon, general, and guard, will append available moves
-                # if attempted destination is not occupied and not too far from starting position given piece rules
-                if self.get_piece_name() != "Cannon" and (self.get_piece_name() != "General" and
-                        self.get_piece_name() != "Guard") and destination not in occupied \
-                        and destination not in coords and too_far is False:
-                    coords.append(destination)
 
-                # if piece is capturable
-                if self.get_piece_name() != "Cannon" and (self.get_piece_name() != "General" and
-                        self.get_piece_name() != "Guard") and destination in \
-                        board.get_occupied(opposite_color).values() and destination not in coords \
-                        and too_far is False:
-                    coords.append(destination)
+ZOBRIST_PIECES, ZOBRIST_RED_TO_MOVE = _build_zobrist_keys()
 
-                # if piece is blocked by a piece of the same color
-                elif destination in board.get_occupied(color).values():
-                    collision = True
+# piece values in the order of PIECE_NAMES. the general has no value since losing it ends the game.
+PIECE_VALUES = (0, 300, 500, 300, 1300, 700, 200)
 
-                else:
-                    if too_far is True and self.get_piece_name() != "Cannon" and \
-                        (self.get_piece_name() != "General" and self.get_piece_name() != "Guard"):
 
-                        collision = True
+def _piece_square_bonus(piece_type, row, col):
+    '''
+    The positional bonus for a piece on a square, counting rows from the piece's own side of the board, so row 0 is
+    its back row and row 9 the other player's back row.
 
-                row_temp, col_temp = row_temp + x_movement, col_temp + y_movement
+    Receives: the piece type and the row and column
+    Returns: the bonus
+    '''
 
-        return coords
+    # 0 on the edge files up to 4 on the middle file, and 0 on the back rows up to 4 in the middle of the board
+    center = 4 - abs(col - 4)
+    middle = min(row, BOARD_ROWS - 1 - row)
 
-    def horse_elephant(self, row, col, board, direction, capturable):
-        '''
-        After a list is returned for valid spaces for the horse and elephant pieces to move,
-        this method checks if moving to that spot requires moving through a piece.
+    # soldiers gain as they advance, most in and in front of the other palace, and less on the last row where they
+    # can only move sideways
+    if piece_type == SOLDIER:
+        bonus = (0, 0, 0, 0, 5, 15, 25, 40, 50, 20)[row]
 
-        If the horse/elephant has to move through a piece to get to the valid destination, that destination is
-        no longer valid and removed from the valid moves list.
-        
-        Recieves: row, col, board, directions, and capturable list
-        Returns: list of available coordinates either the horse or elephant list can move to
-        '''
+        if row >= 6 and 3 <= col <= 5:
+            bonus += 15
 
-        counter = 0
-        inner_counter = 0
+        return bonus
 
-        possible_coords = []
-        actual_possible = []
+    # horses and elephants reach more squares and are blocked less away from the edges
+    if piece_type == HORSE:
+        return 5 * center + 5 * middle
 
-        # loop that moves through all possible directions the piece can move
-        while counter < 8:
+    if piece_type == ELEPHANT:
+        return 3 * center + 3 * middle
 
-            for x_movement, y_movement in direction[counter]:
+    # the general and guards are safest on the center and back of their palace
+    if piece_type == GENERAL:
+        return {(1, 4): 15, (0, 4): 10, (2, 4): -10, (2, 3): -15, (2, 5): -15}.get((row, col), 0)
 
-                inner_counter += 1
+    if piece_type == GUARD:
+        return {(1, 4): 10, (0, 3): 5, (0, 5): 5, (0, 4): 5}.get((row, col), 0)
 
-                if inner_counter == 1:
-                    row_temp, col_temp = row + x_movement, col + y_movement
+    # chariots and cannons on the palace files bear on the generals
+    if piece_type in (CHARIOT, CANNON) and 3 <= col <= 5:
+        return 10
 
-                else:
-                    row_temp, col_temp = row_temp + x_movement, col_temp + y_movement
+    return 0
+
+
+def _build_piece_square():
+    '''
+    Works out the score of each piece on each square, its value plus its positional bonus. Red's scores are positive
+    and blue's negative, so the score of a board is one sum.
+
+    Receives: none
+    Returns: a tuple of the scores by square for each piece code
+    '''
+
+    piece_square = []
+
+    for color in ('red', 'blue'):
+        for piece_type in range(len(PIECE_NAMES)):
+            scores = []
+
+            for row, col in COORDS:
+                if color == 'blue':
+                    row = BOARD_ROWS - 1 - row
+
+                score = PIECE_VALUES[piece_type] + _piece_square_bonus(piece_type, row, col)
+                scores.append(score if color == 'red' else -score)
+
+            piece_square.append(tuple(scores))
+
+    return tuple(piece_square)
+
+
+PIECE_SQUARE = _build_piece_square()
+
+
+def opposite(color):
+    '''
+    Returns the other player's color.
+    '''
+
+    if color == 'blue':
+        return 'red'
+
+    return 'blue'
+
+
+def _to_bitboard(coordinates):
+    '''
+    Returns a bitboard with the bits of a list of (row, col) coordinates set.
+    '''
+
+    bitboard = 0
+
+    for row, col in coordinates:
+        bitboard |= 1 << (row * BOARD_COLS + col)
+
+    return bitboard
+
+
+def _bits(bitboard):
+    '''
+    Yields the square numbers of the set bits in a bitboard, lowest first.
+    '''
+
+    while bitboard:
+        low = bitboard & -bitboard
+        yield low.bit_length() - 1
+        bitboard ^= low
+
+# moves packed into 16 bits as from square | to square << 7 | flags << 14, so a list of moves fits in an
+# array('H'). a pass keeps a square (the general's) in both places and has the pass flag set.
+MOVE_TO_SHIFT = 7
+MOVE_SQUARE_MASK = 0x7F
+MOVE_CAPTURE = 1 << 14
+MOVE_PASS = 1 << 15
+
+# algebraic names to square numbers and the column letters and row numbers to indices, the reverse of ALGEBRAIC
+SQUARE_INDEX = {name: square for square, name in enumerate(ALGEBRAIC)}
+COLUMN_INDEX = {letter: col for col, letter in enumerate("abcdefghi")}
+ROW_INDEX = {str(row + 1): row for row in range(BOARD_ROWS)}
+
+
+def encode_move(square_from, square_to, flags=0):
+    '''
+    Packs a move into an integer from its squares and flags (MOVE_CAPTURE, MOVE_PASS).
+    '''
+
+    return square_from | square_to << MOVE_TO_SHIFT | flags
+
+
+def move_squares(move):
+    '''
+    Returns the from and to square numbers of a packed move.
+    '''
+
+    return move & MOVE_SQUARE_MASK, move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK
+
+
+def move_to_algebraic(move):
+    '''
+    Returns a packed move as the (move_from, move_to) strings make_move takes, the same square twice for a pass.
+    '''
+
+    return ALGEBRAIC[move & MOVE_SQUARE_MASK], ALGEBRAIC[move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK]
+
+
+def move_from_algebraic(move_from, move_to):
+    '''
+    Packs a move given as algebraic strings such as 'b3' and 'b10', a pass if both are the same square. The capture
+    flag depends on the board, so it is not set. Raises ValueError for a string that is not a square.
+    '''
+
+    if move_from not in SQUARE_INDEX or move_to not in SQUARE_INDEX:
+        raise ValueError("not a square: " + repr(move_from if move_from not in SQUARE_INDEX else move_to))
+
+    if move_from == move_to:
+        return encode_move(SQUARE_INDEX[move_from], SQUARE_INDEX[move_to], MOVE_PASS)
+
+    return encode_move(SQUARE_INDEX[move_from], SQUARE_INDEX[move_to])
 
-                destination = (row_temp, col_temp)
 
-                # horses and elephant pieces need to move one square orthogonally before moving either one or two 
-                # squares diagonally. this appends all possible movements a piece can make. 
-                if self.is_in_board(row_temp, col_temp) and inner_counter == 1:
-                    first_move = destination
-                    possible_coords.append(first_move)
+def move_to_string(move):
+    '''
+    Returns a packed move as text, such as 'b3 b10', or 'pass'.
+    '''
+
+    if move & MOVE_PASS:
+        return "pass"
+
+    return " ".join(move_to_algebraic(move))
+
+
+def parse_transcript(transcript):
+    '''
+    Turns a game written out as squares in pairs, such as 'b3 b10 c7 c6 e9 e9', into an array('H') of packed moves.
+    The squares can be separated by spaces or commas, and a pass is the same square twice. Raises ValueError
+    naming the move if a square is not on the board or the last move is missing its destination.
+    '''
+
+    names = transcript.replace(",", " ").split()
+
+    try:
+        squares = [SQUARE_INDEX[name] for name in names]
+    except KeyError:
+        for index, name in enumerate(names):
+            if name not in SQUARE_INDEX:
+                raise ValueError("move " + str(index // 2 + 1) + ": " + repr(name) + " is not a square") from None
+
+    if len(squares) % 2:
+        raise ValueError("move " + str(len(squares) // 2 + 1) + ": " + repr(names[-1]) + " has no square to move to")
+
+    return array('H', [square_from | square_to << MOVE_TO_SHIFT | (MOVE_PASS if square_from == square_to else 0)
+                       for square_from, square_to in zip(squares[::2], squares[1::2])])
+
+
+def format_transcript(moves):
+    '''
+    Writes packed moves out as a transcript parse_transcript can read, such as 'b3 b10 c7 c6 e9 e9'.
+    '''
+
+    return " ".join([ALGEBRAIC[move & MOVE_SQUARE_MASK] + " " + ALGEBRAIC[move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK]
+                     for move in moves])
+
+# ---------------------------INSTRUMENTATION-----------------------------#
+
+# the counters being collected, or None when instrumentation is off. the move code only checks this for None, so
+# leaving it off costs next to nothing. counters are:
+#   get_occupied          calls to Board.get_occupied
+#   squares_scanned       squares listed by iter_occupied and get_squares
+#   candidates.<piece>    moves given by each piece type's check_moves
+#   legality_probes       moves made to see if they leave the general in check, by legal_moves, get_valid_moves,
+#                         is_in_checkmate and make_move
+#   is_in_check           calls to JanggiGame.is_in_check
+#   make_move             moves tried with make_move, play_move or play_packed
+#   make_move.<stage>_ns  nanoseconds spent in each stage of those moves, lookup (finding and checking the piece),
+#                         generate (check_capture and check_moves), validate, check_test (making the move and testing
+#                         for check) and checkmate (testing the other player for checkmate)
+_stats = None
+
+
+def start_instrumentation():
+    '''
+    Turns instrumentation on with every counter at 0. Turning it on again starts the counters over.
+
+    Receives: none
+    Returns: none
+    '''
+
+    global _stats
+    _stats = Counter()
+
+
+def stop_instrumentation():
+    '''
+    Turns instrumentation off.
+
+    Receives: none
+    Returns: the counters collected, as get_stats gives them
+    '''
+
+    global _stats
+    stats = get_stats()
+    _stats = None
+
+    return stats
 
-                if self.is_in_board(row_temp, col_temp) and inner_counter == 2:
-                    second_move = destination
-                    possible_coords.append(second_move)
 
-                # horses can only move one square diagonally whereas elephants can move 2, tests to see whether
-                # there needs to be 2 or 3 moves to the list
-                if self.is_in_board(row_temp, col_temp) and inner_counter == len(direction[counter]) \
-                        and len(direction[counter]) > 2:
-                    last_move = destination
-                    possible_coords.append(last_move)
+def get_stats():
+    '''
+    Takes a snapshot of the counters collected so far.
+
+    Receives: none
+    Returns: a dictionary of counter name : count, empty if instrumentation is off
+    '''
+
+    if _stats is None:
+        return {}
+
+    return dict(sorted(_stats.items()))
+
+
+@contextmanager
+def instrumented():
+    '''
+    Collects counters for the code in a with block, handing back a dictionary that holds them once the block ends.
+    Whatever was being collected before the block carries on after it, with the block's counts added.
+
+        with instrumented() as stats:
+            game.make_move('c7', 'c6')
+        print(stats['is_in_check'])
+
+    Receives: none
+    Returns: the dictionary, filled in when the block ends
+    '''
+
+    global _stats
+
+    outer = _stats
+    result = {}
+    _stats = Counter()
+
+    try:
+        yield result
+    finally:
+        inner = _stats
+        result.update(sorted(inner.items()))
+
+        if outer is not None:
+            outer.update(inner)
+
+        _stats = outer
 
-            # tests to see if any of the possible moves gotten from above are occupied and thus any subsequent
-            # moves would be invalid
-            if inner_counter == len(direction[counter]) and len(possible_coords) == len(direction[0]):
 
-                move_1 = False
-                move_2 = False
+def _lap(stats, stage, started):
+    '''
+    Adds the time since started to a make_move stage's counter.
+
+    Receives: the counters, the stage name and the perf_counter_ns time the stage started
+    Returns: the time now, when the next stage starts
+    '''
+
+    now = perf_counter_ns()
+    stats["make_move." + stage + "_ns"] += now - started
+
+    return now
+
+
+# ------------------------------PIECES-----------------------------------#
+
+class ChessPiece:
+    '''
+    The chess piece class which works for all the pieces, will need to communicate with the other piece classes
+    the JanggiGame class, and possibly the board class. It will need to do so so that pieces and
+    information from pieces can be accessed moves can be made within the game.
+
+    This class will setup the basics of the chess pieces to inherit from. It will determine possible moves,
+    possible captures, and whether a move is valid or not. It will also provide get methods for piece names and
+    color for players.
 
-                if possible_coords[0] not in board.get_occupied().values():
-                    move_1 = True
+    Pieces hold nothing that changes during a game, so there is one shared piece object for each color and type
+    (see shared_piece) and every square and board with that piece uses it.
+    '''
 
-                if move_1 is True and possible_coords[1] not in board.get_occupied().values():
-                    move_2 = True
+    __slots__ = ('_player', '_piece_name', '_type', '_code')
 
-                if move_1 is True and move_2 is True and possible_coords[-1] not in board.get_occupied().values():
-                    actual_possible.append(possible_coords[-1])
+    def __init__(self, player, piece_name):
+        '''
+        init method for the chess piece class that will initialize the data members
 
-                if move_1 is True and possible_coords[1] == possible_coords[-1] and possible_coords[-1] in capturable:
-                    actual_possible.append(possible_coords[-1])
+        Recieves: takes as parameter which player's piece is being moved and the name of the piece being moved.
+        Returns: nothing
+        '''
 
-                if move_1 is True and move_2 is True and possible_coords[-1] in capturable:
-                    actual_possible.append(possible_coords[-1])
+        self._player = player
+        self._piece_name = piece_name
+        self._type = PIECE_TYPES[piece_name]
+        self._code = COLOR_OFFSET[player] + self._type
 
-            counter += 1
-            inner_counter = 0
-            possible_coords = []
+    def __reduce__(self):
+        '''
+        Pickles a piece as its color and name, so unpickling gives back the shared piece object.
+        '''
 
-        return actual_possible
+        return shared_piece, (self._player, self._piece_name)
 
-    def is_in_board(self, row, col):
+    def get_piece_name(self):
         '''
-        Checks to see if a coordinates remains in the board.
+        Get method for the name of the piece located on the board. 
         
-        Receives: row, col
-        Returns: either True or False if destination remains in the board indices
+        Receives: none
+        Returns: the piece name
         '''
 
-        if row >= 0 and row < 10 and col >= 0 and col < 9:
-            return True
+        return self._piece_name
 
-        return False
+    def get_player(self):
+        '''
+        Get method for the color of the player of the piece located on the board. 
 
-    def is_in_palace(self, row, col, color=None):
+        Receives: none
+        Returns: the player color of the selected piece
         '''
-        Checks to see if a coordinates remains in the board.
+        
+        return self._player
 
-        Receives: row, col, and color as a default parameter
-        Returns: either True or False if destination remains in the palace indices
+    def get_type(self):
         '''
+        Get method for the integer code of the piece's type, GENERAL through SOLDIER.
 
-        if color == 'red' and row >= 0 and row < 3 and col >= 3 and col < 6:
-            return True
+        Receives: none
+        Returns: the type code
+        '''
 
-        if color == 'blue' and row >= 7 and row < 10 and col >= 3 and col < 6:
-            return True
+        return self._type
 
-        return False
+    def get_code(self):
+        '''
+        Get method for the integer code of the piece's color and type together, used to index the board's tables.
+
+        Receives: none
+        Returns: the piece code
+        '''
+
+        return self._code
 
     def is_valid(self, row_to, col_to, moves_list):
         '''
@@ -392,19 +653,21 @@ class ChessPiece:
         
         captured = []
         destination = (row_to, col_to)
+        red = board.get_bitboard('red')
+        blue = board.get_bitboard('blue')
 
-        if color == "blue" and destination in board.get_occupied('red').values():
+        if color == "blue" and red >> (row_to * BOARD_COLS + col_to) & 1:
             captured.append(destination)
 
-        if color == 'red' and destination in board.get_occupied('blue').values():
+        if color == 'red' and blue >> (row_to * BOARD_COLS + col_to) & 1:
             captured.append(destination)
 
         if updated_moves is not None:
-            for items in updated_moves:
-                if color == 'red' and items in board.get_occupied('blue').values():
-                    captured.append(items)
-                if color == 'blue' and items in board.get_occupied('red').values():
-                    captured.append(items)
+            for row, col in updated_moves:
+                if color == 'red' and blue >> (row * BOARD_COLS + col) & 1:
+                    captured.append((row, col))
+                if color == 'blue' and red >> (row * BOARD_COLS + col) & 1:
+                    captured.append((row, col))
 
         return captured
 
@@ -416,6 +679,8 @@ class General(ChessPiece):
     Movement: Anywhere within the place, one point.
     '''
 
+    __slots__ = ()
+
     def __init__(self, player, piece_name):
         '''
         The init method for the general class that initializes all data members.
@@ -442,18 +707,12 @@ class General(ChessPiece):
         Returns: List of coordinates of available moves.
         '''
 
-        direction = self._orth
-        palace = None
-        red = self.is_in_palace(row_from, col_from, 'red')
-        blue = self.is_in_palace(row_from, col_from, 'blue')
+        moves = board.palace_moves(row_from, col_from, color)
 
-        if red:
-            palace = 'red'
+        if _stats is not None:
+            _stats["candidates." + self._piece_name] += len(moves)
 
-        if blue:
-            palace = 'blue'
-
-        return self.possible_moves(row_from, col_from, board, color, direction, capturable, 1, 1, palace)
+        return moves
 
 
 class Guard(ChessPiece):
@@ -463,6 +722,8 @@ class Guard(ChessPiece):
     Movement: Same as general, confined to the palace.
     '''
 
+    __slots__ = ()
+
     def __init__(self, player, piece_name):
         '''
         The init method for the guard class that initializes all data members.
@@ -489,18 +750,12 @@ class Guard(ChessPiece):
         Returns: List of coordinates of available moves.
         '''
 
-        direction = self._orth
-        palace = None
-        red = self.is_in_palace(row_from, col_from, 'red')
-        blue = self.is_in_palace(row_from, col_from, 'blue')
+        moves = board.palace_moves(row_from, col_from, color)
 
-        if red:
-            palace = 'red'
+        if _stats is not None:
+            _stats["candidates." + self._piece_name] += len(moves)
 
-        if blue:
-            palace = 'blue'
-
-        return self.possible_moves(row_from, col_from, board, color, direction, capturable, 1, 1, palace)
+        return moves
 
 
 class Horse(ChessPiece):
@@ -510,6 +765,8 @@ class Horse(ChessPiece):
     Movement: One point forward, backward, left or right, then one point outward diagonally. Can be blocked by others.
     '''
 
+    __slots__ = ()
+
     def __init__(self, player, piece_name):
         '''
         The init method for the horse class that initializes all data members
@@ -536,22 +793,12 @@ class Horse(ChessPiece):
         Returns: List of coordinates of available moves.
         '''
 
-        right_up = [(0, 1), (-1, 1)]
-        right_down = [(0, 1), (1, 1)]
-
-        up_left = [(-1, 0), (-1, -1)]
-        up_right = [(-1, 0), (-1, 1)]
-
-        left_up = [(0, -1), (1, -1)]
-        left_down = [(0, -1), (-1, -1)]
+        moves = board.horse_moves(row_from, col_from, capturable)
 
-        down_right = [(1, 0), (1, 1)]
-        down_left = [(1, 0), (1, -1)]
+        if _stats is not None:
+            _stats["candidates." + self._piece_name] += len(moves)
 
-        directions = [right_up] + [right_down] + [left_up] + [left_down] + \
-                     [up_left] + [up_right] + [down_right] + [down_left]
-
-        return self.horse_elephant(row_from, col_from, board, directions, capturable)
+        return moves
 
 
 class Elephant(ChessPiece):
@@ -562,6 +809,8 @@ class Elephant(ChessPiece):
     Can be blocked.
     '''
 
+    __slots__ = ()
+
     def __init__(self, player, piece_name):
         '''
         The init method for the elephant class that initializes all data members
@@ -588,22 +837,12 @@ class Elephant(ChessPiece):
         Returns: List of coordinates of available moves.
         '''
 
-        right_up = [(0, 1), (-1, 1), (-1, 1)]
-        right_down = [(0, 1), (1, 1), (1, 1)]
-
-        up_left = [(-1, 0), (-1, -1), (-1, -1)]
-        up_right = [(-1, 0), (-1, 1), (-1, 1)]
-
-        left_up = [(0, -1), (1, -1), (1, -1)]
-        left_down = [(0, -1), (-1, -1), (-1, -1)]
+        moves = board.elephant_moves(row_from, col_from, capturable)
 
-        down_right = [(1, 0), (1, 1), (1, 1)]
-        down_left = [(1, 0), (1, -1), (1, -1)]
+        if _stats is not None:
+            _stats["candidates." + self._piece_name] += len(moves)
 
-        directions = [right_up] + [right_down] + [left_up] + [left_down] + \
-                     [up_left] + [up_right] + [down_right] + [down_left]
-
-        return self.horse_elephant(row_from, col_from, board, directions, capturable)
+        return moves
 
 
 class Chariot(ChessPiece):
@@ -614,6 +853,8 @@ class Chariot(ChessPiece):
     Can also move diagonally within the palace. Can be blocked by other pieces.
     '''
 
+    __slots__ = ()
+
     def __init__(self, player, piece_name):
         '''
         The init method for the chariot class that initializes all data members.
@@ -640,18 +881,12 @@ class Chariot(ChessPiece):
         Returns: List of coordinates of available moves.
         '''
 
-        direction = self._orth
-        palace = None
-        red = self.is_in_palace(row_from, col_from, 'red')
-        blue = self.is_in_palace(row_from, col_from, 'blue')
+        moves = board.chariot_moves(row_from, col_from, color)
 
-        if red:
-            palace = 'red'
+        if _stats is not None:
+            _stats["candidates." + self._piece_name] += len(moves)
 
-        if blue:
-            palace = 'blue'
-
-        return self.possible_moves(row_from, col_from, board, color, direction, capturable, 10, 9, palace)
+        return moves
 
 
 class Cannon(ChessPiece):
@@ -663,6 +898,8 @@ class Cannon(ChessPiece):
     cannot capture another cannon.
     '''
 
+    __slots__ = ()
+
     def __init__(self, player, piece_name):
         '''
         The init method for the cannon class that initializes all data members.
@@ -689,18 +926,12 @@ class Cannon(ChessPiece):
         Returns: List of coordinates of available moves.
         '''
 
-        direction = self._orth
-        palace = None
-        red = self.is_in_palace(row_from, col_from, 'red')
-        blue = self.is_in_palace(row_from, col_from, 'blue')
+        moves = board.cannon_moves(row_from, col_from, color)
 
-        if red:
-            palace = 'red'
+        if _stats is not None:
+            _stats["candidates." + self._piece_name] += len(moves)
 
-        if blue:
-            palace = 'blue'
-
-        return self.possible_moves(row_from, col_from, board, color, direction, capturable, 10, 9, palace)
+        return moves
 
 
 class Soldier(ChessPiece):
@@ -710,6 +941,8 @@ class Soldier(ChessPiece):
     Movement: One point either forward or sideways. May move diagonally within the palace.
     '''
 
+    __slots__ = ()
+
     def __init__(self, player, piece_name):
         '''
         The init method for the soldier class that initializes all data members.
@@ -736,33 +969,57 @@ class Soldier(ChessPiece):
         Returns: List of coordinates of available moves.
         '''
 
-        palace = None
+        moves = board.soldier_moves(row_from, col_from, color)
 
-        if color == 'blue':
-            direction = (0, -1), (0, 1), (-1, 0)
-            red = self.is_in_palace(row_from, col_from, 'red')
+        if _stats is not None:
+            _stats["candidates." + self._piece_name] += len(moves)
 
-            if red:
-                palace = 'red'
+        return moves
 
-        if color == 'red':
-            direction = (0, -1), (0, 1), (1, 0)
-            blue = self.is_in_palace(row_from, col_from, 'blue')
 
-            if blue:
-                palace = 'blue'
+_PIECE_CLASSES = (General, Guard, Horse, Elephant, Chariot, Cannon, Soldier)
 
-        return self.possible_moves(row_from, col_from, board, color, direction, capturable, 1, 1, palace)
+# the shared piece objects, indexed by piece code
+PIECES = tuple(_PIECE_CLASSES[piece_type](color, PIECE_NAMES[piece_type])
+               for color in ('red', 'blue') for piece_type in range(len(PIECE_NAMES)))
 
-# -------------------------------BOARD-----------------------------------#
-class Board:
+
+def shared_piece(color, piece_name):
+    '''
+    Returns the shared piece object for a color and piece name, such as shared_piece('red', 'Chariot').
     '''
-    Class that represents the board for the JanggiGame class.
 
-    Responsibilities of the class include initializing the board, displaying it, and
-    storing the location of the pieces.
+    return PIECES[COLOR_OFFSET[color] + PIECE_TYPES[piece_name]]
 
-    Will interact with all classes because the board will need to be updated as the game progresses.
+
+# the letters for the pieces in a position string, upper case for blue and lower case for red, and the pieces for
+# each letter. the guard is A, for advisor, since G is the general.
+PIECE_LETTERS = tuple(letter.lower() for letter in "GAHERCS") + tuple("GAHERCS")
+LETTER_PIECES = {letter: PIECES[code] for code, letter in enumerate(PIECE_LETTERS)}
+
+START_POSITION = "reha1aehr/4g4/1c5c1/s1s1s1s1s/9/9/S1S1S1S1S/1C5C1/4G4/REHA1AEHR b 1"
+
+# a frozen game (see JanggiGame.freeze) starts with the format version, the turn, the game state (with FROZEN_RESIGNED
+# set if a player resigned), and the number of pieces and of moves that follow
+FROZEN_VERSION = 2
+_FROZEN_HEADER = struct.Struct("<BIBBI")
+FROZEN_RESIGNED = 0x80
+
+GAME_STATES = ("UNFINISHED", "BLUE_WON", "RED_WON")
+
+# the highest turn a position string can give. the frozen turn is 32 bits, so a game started from any position can
+# still be frozen after 0xFFFF moves, and freeze refuses a game whose turn has grown past that
+MAX_TURN = 0xFFFFFFFF - 0xFFFF
+
+# -------------------------------BOARD-----------------------------------#
+class Board:
+    '''
+    Class that represents the board for the JanggiGame class.
+
+    Responsibilities of the class include initializing the board, displaying it, and
+    storing the location of the pieces.
+
+    Will interact with all classes because the board will need to be updated as the game progresses.
     '''
 
     def __init__(self):
@@ -774,74 +1031,78 @@ class Board:
         Returns: none
         '''
 
+        # bitboards with one bit per square, for each color and for each piece code
+        self._color_bb = {'red': 0, 'blue': 0}
+        self._piece_bb = [0] * len(PIECES)
+
+        # (row, col) : piece object for looking up a square, and the same for each color's pieces, kept up to date
+        # by set_piece so get_occupied can hand out a view of them without scanning the board
         self._occupied = {}
-        self._occupied_red = {}
-        self._occupied_blue = {}
+        self._occupied_color = {'red': {}, 'blue': {}}
 
-        # creates 9x10 empty board using a list within a list
-        self._board = [[], [], [], [], [], [], [], [], [], []]
-        board_size = 10
+        # zobrist hash of the pieces on the board, also kept up to date by set_piece
+        self._hash = 0
 
-        for i in range(board_size):
-            spacing = "       "
-            self._board[i] = [spacing] * 9
+        # material and piece square score of the pieces on the board, red's minus blue's, also kept up to date by
+        # set_piece
+        self._score = 0
 
     def create_board(self):
         '''
         The create_board class that displays the board. Will place all the initial pieces.
 
         Recieves: no parameters
-        Returns: self._board, which is the display of the board with all the pieces placed (initially).
+        Returns: the display of the board with all the pieces placed (initially), as get_grid gives it.
         '''
 
         count = 0
 
         # red - top of board
-        self._board[0][0] = Chariot("red", "Chariot")
-        self._board[0][1] = Elephant("red", "Elephant")
-        self._board[0][2] = Horse("red", "Horse")
-        self._board[0][3] = Guard("red", "Guard")
+        self.set_piece(0, 0, shared_piece("red", "Chariot"))
+        self.set_piece(0, 1, shared_piece("red", "Elephant"))
+        self.set_piece(0, 2, shared_piece("red", "Horse"))
+        self.set_piece(0, 3, shared_piece("red", "Guard"))
 
-        self._board[0][5] = Guard("red", "Guard")
-        self._board[0][6] = Elephant("red", "Elephant")
-        self._board[0][7] = Horse("red", "Horse")
-        self._board[0][8] = Chariot("red", "Chariot")
+        self.set_piece(0, 5, shared_piece("red", "Guard"))
+        self.set_piece(0, 6, shared_piece("red", "Elephant"))
+        self.set_piece(0, 7, shared_piece("red", "Horse"))
+        self.set_piece(0, 8, shared_piece("red", "Chariot"))
 
-        self._board[1][4] = General("red", "General")
+        self.set_piece(1, 4, shared_piece("red", "General"))
 
-        self._board[2][1] = Cannon("red", "Cannon")
-        self._board[2][7] = Cannon("red", "Cannon")
+        self.set_piece(2, 1, shared_piece("red", "Cannon"))
+        self.set_piece(2, 7, shared_piece("red", "Cannon"))
 
-        self._board[3][0] = Soldier("red", "Soldier")
-        self._board[3][2] = Soldier("red", "Soldier")
-        self._board[3][4] = Soldier("red", "Soldier")
-        self._board[3][6] = Soldier("red", "Soldier")
-        self._board[3][8] = Soldier("red", "Soldier")
+        self.set_piece(3, 0, shared_piece("red", "Soldier"))
+        self.set_piece(3, 2, shared_piece("red", "Soldier"))
+        self.set_piece(3, 4, shared_piece("red", "Soldier"))
+        self.set_piece(3, 6, shared_piece("red", "Soldier"))
+        self.set_piece(3, 8, shared_piece("red", "Soldier"))
 
         # blue - bottom of board
-        self._board[9][0] = Chariot("blue", "Chariot")
-        self._board[9][1] = Elephant("blue", "Elephant")
-        self._board[9][2] = Horse("blue", "Horse")
-        self._board[9][3] = Guard("blue", "Guard")
+        self.set_piece(9, 0, shared_piece("blue", "Chariot"))
+        self.set_piece(9, 1, shared_piece("blue", "Elephant"))
+        self.set_piece(9, 2, shared_piece("blue", "Horse"))
+        self.set_piece(9, 3, shared_piece("blue", "Guard"))
 
-        self._board[9][5] = Guard("blue", "Guard")
-        self._board[9][6] = Elephant("blue", "Elephant")
-        self._board[9][7] = Horse("blue", "Horse")
-        self._board[9][8] = Chariot("blue", "Chariot")
+        self.set_piece(9, 5, shared_piece("blue", "Guard"))
+        self.set_piece(9, 6, shared_piece("blue", "Elephant"))
+        self.set_piece(9, 7, shared_piece("blue", "Horse"))
+        self.set_piece(9, 8, shared_piece("blue", "Chariot"))
 
-        self._board[8][4] = General("blue", "General")
+        self.set_piece(8, 4, shared_piece("blue", "General"))
 
-        self._board[7][1] = Cannon("blue", "Cannon")
-        self._board[7][7] = Cannon("blue", "Cannon")
+        self.set_piece(7, 1, shared_piece("blue", "Cannon"))
+        self.set_piece(7, 7, shared_piece("blue", "Cannon"))
 
-        self._board[6][0] = Soldier("blue", "Soldier")
-        self._board[6][2] = Soldier("blue", "Soldier")
-        self._board[6][4] = Soldier("blue", "Soldier")
-        self._board[6][6] = Soldier("blue", "Soldier")
-        self._board[6][8] = Soldier("blue", "Soldier")
+        self.set_piece(6, 0, shared_piece("blue", "Soldier"))
+        self.set_piece(6, 2, shared_piece("blue", "Soldier"))
+        self.set_piece(6, 4, shared_piece("blue", "Soldier"))
+        self.set_piece(6, 6, shared_piece("blue", "Soldier"))
+        self.set_piece(6, 8, shared_piece("blue", "Soldier"))
 
         # prints algebraic notation for rows -- used for testing
-        # for i in self._board:
+        # for i in self.get_grid():
         #     print("s" + str(count + 1), count,  i)
         #     count += 1
 
@@ -851,7 +1112,7 @@ class Board:
         # print(space*10 + "a", space*10 + "b", space *10 + "c", space*10 + "d",  space*8 + "e",
         #       space*8 + "f", space*10 + "g", space*10 + "h", space*10 + "i",)
 
-        return self._board
+        return self.get_grid()
 
     def get_piece(self, row, col):
         '''
@@ -861,7 +1122,7 @@ class Board:
         Returns: the piece at the specified location
         '''
 
-        return self._board[row][col]
+        return self._occupied.get((row, col), EMPTY)
 
     def set_piece(self, row, col, piece):
         '''
@@ -872,20 +1133,85 @@ class Board:
         Returns: sets the piece object at the specified location.
         '''
 
-        self._board[row][col] = piece
+        square = row * BOARD_COLS + col
+        bit = 1 << square
+        coordinates = COORDS[square]
+        old_piece = self._occupied.pop(coordinates, None)
+
+        # removes whatever was on the square from the bitboards and the occupied squares
+        if old_piece is not None:
+            code = old_piece.get_code()
+            player = old_piece.get_player()
+            del self._occupied_color[player][coordinates]
+            self._color_bb[player] ^= bit
+            self._piece_bb[code] ^= bit
+            self._hash ^= ZOBRIST_PIECES[code][square]
+            self._score -= PIECE_SQUARE[code][square]
+
+        # adds the new piece to the bitboards and the occupied squares
+        if type(piece) != str:
+            code = piece.get_code()
+            player = piece.get_player()
+            self._occupied[coordinates] = piece
+            self._occupied_color[player][coordinates] = piece
+            self._color_bb[player] |= bit
+            self._piece_bb[code] |= bit
+            self._hash ^= ZOBRIST_PIECES[code][square]
+            self._score += PIECE_SQUARE[code][square]
+
+    def get_hash(self):
+        '''
+        Get method for the zobrist hash of the pieces on the board.
+
+        Receives: none
+        Returns: the hash as a 64 bit integer
+        '''
+
+        return self._hash
+
+    def get_score(self, color):
+        '''
+        Get method for the material and piece square score of the board, from PIECE_SQUARE. Kept up to date as
+        pieces are set, so it costs nothing to ask for.
+
+        Receives: the color to score the board for
+        Returns: the color's score minus the other color's
+        '''
+
+        if color == 'red':
+            return self._score
+
+        return -self._score
+
+    def get_grid(self):
+        '''
+        Builds the 10x9 list of lists view of the board used for displaying it, with the pieces on their squares
+        and the empty squares filled with spacing.
+
+        Receives: none
+        Returns: the list of rows
+        '''
+
+        grid = [[EMPTY] * BOARD_COLS for row in range(BOARD_ROWS)]
+
+        for (row, col), piece in self._occupied.items():
+            grid[row][col] = piece
+
+        return grid
 
     def display_board(self):
         '''
         Displays the current state of the board.
 
         Receives: none
-        Returns: self._board
+        Returns: the grid of the board, as get_grid gives it
         '''
 
         space = " "
         count = 0
+        grid = self.get_grid()
 
-        for i in self._board:
+        for i in grid:
             print("s" + str(count + 1), count, i)
             count += 1
 
@@ -894,7 +1220,7 @@ class Board:
         print(space*10 + "a", space*10 + "b", space *10 + "c", space*10 + "d",  space*8 + "e",
               space*8 + "f", space*10 + "g", space*10 + "h", space*10 + "i",)
 
-        return self._board
+        return grid
 
     def get_occupied(self, color=None):
         '''
@@ -902,444 +1228,1559 @@ class Board:
 
         Receives: color as a default parameter if one wants to get a specific color of the pieces on the board.
 
-        Returns: if color parameter is given, then returns a dictionary with key, value of piece object : current
-        coordinates on the board for the pieces of that color. If not color is given the returns the same dictionary
-        with all the pieces and coordinates they are located in on the board.
+        Returns: if color parameter is given, then returns a read-only dictionary view with key, value of current
+        coordinates on the board : piece object for the pieces of that color. If not color is given the returns the
+        same view with all the pieces. Pieces of the same color and type are one shared object, so the coordinates
+        are the keys, the other way around from the piece : coordinates dictionary this used to return. The view is
+        of the dictionaries set_piece keeps up to date, so it costs nothing to get and follows the board as it
+        changes.
         '''
 
-        occupied_pieces = []
-        occupied_coords = []
+        if _stats is not None:
+            _stats["get_occupied"] += 1
 
-        col = 0
-        row = 0
+        if color is None:
+            return MappingProxyType(self._occupied)
 
-        while row <= 9 and col <= 8:
-            for items in self._board:
+        return MappingProxyType(self._occupied_color[color])
 
-                square = self._board[row][col]
+    def iter_occupied(self, color=None):
+        '''
+        Method that goes through the occupied squares and the pieces on them, from the bitboards, without building
+        a dictionary.
 
-                if row <= 9 and type(square) != str and color is None:
-                    occupied_pieces.append(square)
-                    occupied_coords.append((row, col))
+        Receives: color as a default parameter if one wants only the pieces of a specific color.
+        Returns: a generator of ((row, col), piece object), in square order
+        '''
 
-                if row <= 9 and type(square) != str and color == 'red' and square.get_player() == 'red':
-                    occupied_pieces.append(square)
-                    occupied_coords.append((row, col))
+        occupied = self._occupied
+        squares = [COORDS[square] for square in _bits(self.get_bitboard(color))]
 
-                if row <= 9 and type(square) != str and color == 'blue' and square.get_player() == 'blue':
-                    occupied_pieces.append(square)
-                    occupied_coords.append((row, col))
+        if _stats is not None:
+            _stats["squares_scanned"] += len(squares)
 
-                row += 1
+        for coordinates in squares:
+            yield coordinates, occupied[coordinates]
 
-            if row > 9:
-                row = 0
-                col += 1
+    def get_squares(self, color=None):
+        '''
+        Method that gets the coordinates of the occupied squares on the board.
 
-        # dictionary comprehension to populate the dictionary
-        self._occupied = {occupied_pieces[i]: occupied_coords[i] for i in range(len(occupied_pieces))}
-        saved_occupied_dict = self._occupied
+        Receives: color as a default parameter if one wants only the squares of a specific color's pieces.
+        Returns: a set of (row, col) coordinates.
+        '''
 
-        # empties the dictionary after each use
-        self._occupied = {}
+        squares = {COORDS[square] for square in _bits(self.get_bitboard(color))}
 
-        return saved_occupied_dict
+        if _stats is not None:
+            _stats["squares_scanned"] += len(squares)
 
-# ------------------------------GAME-------------------------------------#
+        return squares
 
-class JanggiGame:
-    '''
-    Class that starts the game.
+    def get_bitboard(self, color=None, piece_name=None):
+        '''
+        Method that gets a bitboard of the occupied squares, with bit row * 9 + col set for each occupied square.
 
-    Will interact with the board and ChessPiece classes due to updating the game as it progresses.
-    Will need to interact with the Board class to get the board and the ChessPiece class to get and set the
-    pieces on the board.
+        Receives: color and piece name as default parameters to only get the squares of one color, or one color's
+        pieces of one type.
+        Returns: the bitboard as an integer
+        '''
 
-    Will handle input, player movement, determining the game state,
-    determining if a player is in check/checkmate, which player's turn it is, and convert strings for movement
-    to numerical indices.
-    '''
+        if piece_name is not None:
+            return self._piece_bb[COLOR_OFFSET[color] + PIECE_TYPES[piece_name]]
 
-    def __init__(self):
-        '''
-        The init method that for the JanggiGame class that initializes all data members.
+        if color is None:
+            return self._color_bb['red'] | self._color_bb['blue']
 
-        Recieves: none
-        Returns: none
-        '''
+        return self._color_bb[color]
 
-        self._turn = 1
+    # the move generators below work from the bitboards and the tables at the top of the file. each piece's targets
+    # are worked out as square numbers by the underscore methods, which take the square, the color moving and a
+    # bitboard of the squares it may capture on (only used by the horse and elephant).
 
-        self._game_state = "UNFINISHED"
-        self._check_blue = False
-        self._check_red = False
+    def _palace_targets(self, square, color, capturable):
+        '''
+        Target squares for the general and guard, one point along the palace lines onto an empty point of their own
+        palace.
+        '''
 
-        # creates the board
-        self._board = Board()
-        self._new_board = self._board.create_board()
+        if PALACE[square] != color:
+            return []
 
-        self._blue_general = self._board.get_piece(8, 4)
-        self._red_general = self._board.get_piece(1, 4)
+        occupied = self._color_bb['red'] | self._color_bb['blue']
 
-    def get_game_state(self):
+        return [step for step in PALACE_STEPS[square] if not occupied >> step & 1]
+
+    def _horse_targets(self, square, color, capturable):
+        '''
+        Target squares for the horse, one point orthogonally and one outward diagonally, blocked by a piece on the
+        first point.
         '''
-        Get method that returns the game state.
 
-        Recieves: none
-        Returns: the game state
+        occupied = self._color_bb['red'] | self._color_bb['blue']
+
+        return [destination for block, destination in HORSE_STEPS[square]
+                if not occupied >> block & 1 and (not occupied >> destination & 1 or capturable >> destination & 1)]
+
+    def _elephant_targets(self, square, color, capturable):
+        '''
+        Target squares for the elephant, one point orthogonally and two outward diagonally, blocked by a piece on
+        either of the first two points.
         '''
 
-        return self._game_state
+        occupied = self._color_bb['red'] | self._color_bb['blue']
 
-    def all_moves(self, color):
+        return [destination for first_block, second_block, destination in ELEPHANT_STEPS[square]
+                if not occupied >> first_block & 1 and not occupied >> second_block & 1 and
+                (not occupied >> destination & 1 or capturable >> destination & 1)]
+
+    def _chariot_targets(self, square, color, capturable):
+        '''
+        Target squares for the chariot, any distance orthogonally until a piece of its own color, and along the
+        diagonal lines of its own palace.
         '''
-        Returns a list of all available moves for a player's pieces
 
-        Recieves: the players turn (color) as a parameter
-        Returns: list of all available moves for a player's pieces
+        own = self._color_bb[color]
+        moves = []
+
+        for ray, mask, step in ORTH_RAYS[square]:
+            blockers = own & mask
+
+            if not blockers:
+                moves.extend(ray)
+                continue
+
+            # nearest blocker is the lowest set bit going up the square numbers and the highest going down
+            if step > 0:
+                nearest = (blockers & -blockers).bit_length() - 1
+            else:
+                nearest = blockers.bit_length() - 1
+
+            moves.extend(ray[:(nearest - square) // step - 1])
+
+        if PALACE[square] == color:
+            occupied = self._color_bb['red'] | self._color_bb['blue']
+
+            for ray in PALACE_DIAGONAL_RAYS[square]:
+                for step in ray:
+                    if own >> step & 1:
+                        break
+
+                    if not occupied >> step & 1:
+                        moves.append(step)
+
+        return moves
+
+    def _cannon_targets(self, square, color, capturable):
+        '''
+        Target squares for the cannon, jumping orthogonally over a piece that is not a cannon onto an empty square or
+        a piece of the other color, and from a corner of its own palace to the opposite corner over the center.
         '''
 
-        all_avail_moves = []
-        pieces = []
+        own = self._color_bb[color]
+        occupied = self._color_bb['red'] | self._color_bb['blue']
+        cannons = self._piece_bb[COLOR_OFFSET['red'] + CANNON] | self._piece_bb[COLOR_OFFSET['blue'] + CANNON]
+        moves = []
 
-        if color == 'blue':
-            opposing_color = 'red'
+        for ray, mask, step in ORTH_RAYS[square]:
+            if not occupied & mask:
+                continue
 
-        if color == 'red':
-            opposing_color = 'blue'
+            # every piece up to and including the first of its own color can be jumped over
+            for index, screen in enumerate(ray):
+                if not occupied >> screen & 1:
+                    continue
 
-        class_coord_counter = 0
+                if not cannons >> screen & 1:
+                    for jump in ray[index + 1:]:
+                        if not occupied >> jump & 1:
+                            moves.append(jump)
+                            continue
 
-        for keys in self._board.get_occupied(opposing_color).items():
-            pieces += [keys]
+                        if not own >> jump & 1:
+                            moves.append(jump)
+                        break
 
-        # creates a list of all available moves each piece of the given color can make
-        for items in range(len(pieces)):
-            row = pieces[class_coord_counter][1][0]
-            col = pieces[class_coord_counter][1][1]
+                if own >> screen & 1:
+                    break
 
-            the_piece = self._board.get_piece(row, col)
+        # the palace jump needs both the cannon's palace center and the blue palace center to be occupied, and is
+        # there while either palace point next to the corner is free of the cannon's own pieces
+        palace = PALACE[square]
 
-            capture = the_piece.check_capture(row, col, self._board, color)
-            moves = the_piece.check_moves(row, col, self._board, opposing_color, capture)
+        if palace == color and CANNON_PALACE_JUMPS[square] is not None and \
+                occupied >> PALACE_CENTER[palace] & 1 and occupied >> PALACE_CENTER['blue'] & 1:
+            jump, neighbours = CANNON_PALACE_JUMPS[square]
 
-            all_avail_moves += moves # [the_piece.get_piece_name(), moves]
-            class_coord_counter += 1
+            for neighbour in neighbours:
+                if not own >> neighbour & 1:
+                    moves.append(jump)
+                    break
 
-        return all_avail_moves
+        return moves
 
-    def is_in_check(self, color):
+    def _soldier_targets(self, square, color, capturable):
+        '''
+        Target squares for the soldier, one point sideways or forward onto a square without a piece of its own color.
         '''
-        Method that determines whether a player is in check. Checks all moves of opposing pieces to see if any
-        moves land on the coordinates the opposing general is located. If so, returns True.
 
-        Recieves: the players turn (color) as a parameter
-        Returns: either true or false as to whether the player is in check.
+        own = self._color_bb[color]
+
+        return [step for step in SOLDIER_STEPS[color][square] if not own >> step & 1]
+
+    # target methods by piece type
+    _TARGETS = (_palace_targets, _palace_targets, _horse_targets, _elephant_targets, _chariot_targets,
+                _cannon_targets, _soldier_targets)
+
+    def palace_moves(self, row, col, color):
         '''
+        Moves for the general and guard, one point along the palace lines onto an empty point of their own palace.
 
-        if color == 'blue':
-            opponent = 'red'
-            the_general = self._blue_general
+        Receives: row, col of the piece and the color it is moving for
+        Returns: list of coordinates of available moves
+        '''
 
-        if color == 'red':
-            opponent = 'blue'
-            the_general = self._red_general
+        return [COORDS[move] for move in self._palace_targets(row * BOARD_COLS + col, color, 0)]
 
-        all_moves = self.all_moves(color)
+    def horse_moves(self, row, col, capturable):
+        '''
+        Moves for the horse, one point orthogonally and one outward diagonally, blocked by a piece on the first point.
 
-        # gets the location of the opposing general
-        general = [[key, value] for key, value in self._board.get_occupied(color).items()
-                   if key == the_general]
+        Receives: row, col of the piece and the list of coordinates that are able to be captured
+        Returns: list of coordinates of available moves
+        '''
 
-        general_loc = (general[0][1][0], general[0][1][1])
+        return [COORDS[move] for move in self._horse_targets(row * BOARD_COLS + col, None, _to_bitboard(capturable))]
 
-        if general_loc in all_moves:
+    def elephant_moves(self, row, col, capturable):
+        '''
+        Moves for the elephant, one point orthogonally and two outward diagonally, blocked by a piece on either of
+        the first two points.
 
+        Receives: row, col of the piece and the list of coordinates that are able to be captured
+        Returns: list of coordinates of available moves
+        '''
 
-            return True
+        return [COORDS[move] for move in self._elephant_targets(row * BOARD_COLS + col, None,
+                                                                _to_bitboard(capturable))]
 
-        else:
-            return False
+    def chariot_moves(self, row, col, color):
+        '''
+        Moves for the chariot, any distance orthogonally until a piece of its own color, and along the diagonal
+        lines of its own palace.
 
-    def is_in_checkmate(self, color):
+        Receives: row, col of the piece and the color it is moving for
+        Returns: list of coordinates of available moves
         '''
-        Method that determines whether a move has put the other player in checkmate.
 
-        Recieves: color of the player to be tested
-        Returns: True or False depending on if checkmate is achieved.
+        return [COORDS[move] for move in self._chariot_targets(row * BOARD_COLS + col, color, 0)]
+
+    def cannon_moves(self, row, col, color):
         '''
+        Moves for the cannon, jumping orthogonally over a piece that is not a cannon onto an empty square or a piece
+        of the other color, and from a corner of its own palace to the opposite corner over the center.
 
-        capture = []
+        Receives: row, col of the piece and the color it is moving for
+        Returns: list of coordinates of available moves
+        '''
 
-        if color == 'blue':
-            opponent = 'red'
-            the_general = self._blue_general
+        return [COORDS[move] for move in self._cannon_targets(row * BOARD_COLS + col, color, 0)]
 
-        if color == 'red':
-            opponent = 'blue'
-            the_general = self._red_general
+    def soldier_moves(self, row, col, color):
+        '''
+        Moves for the soldier, one point sideways or forward onto a square without a piece of its own color.
 
-        all_moves = self.all_moves(color)
+        Receives: row, col of the piece and the color it is moving for
+        Returns: list of coordinates of available moves
+        '''
 
-        # gets the location and possible moves of the opposing general
-        general = [[key, value] for key, value in self._board.get_occupied(color).items()
-                   if key == the_general]
+        return [COORDS[move] for move in self._soldier_targets(row * BOARD_COLS + col, color, 0)]
 
-        get_general = self._board.get_piece(general[0][1][0], general[0][1][1])
+    def generate_moves(self, color, moves):
+        '''
+        Fills a buffer with every move of a player's pieces as packed integers, with the capture flag set on moves
+        onto an occupied square. Whether a move leaves the player's own general in check is not tested.
 
-        # all moves the opposing general can make
-        general_moves = get_general.check_moves(general[0][1][0],  general[0][1][1], self._board, color, capture)
+        Receives: the color moving and an array('H') (or list) to fill, which is emptied first so the same buffer
+        can be used again and again
+        Returns: the buffer
+        '''
 
-        # if every move the opposing general can make is in the available moves list of the opposing pieces,
-        # the oppposing general has no more moves since every move will result in a capture, thus a checkmate
-        result = all(elem in all_moves for elem in general_moves)
+        del moves[:]
 
-        if result:
-            return True
-        else:
-            return False
+        enemy = self._color_bb[opposite(color)]
+        occupied = self._color_bb['red'] | self._color_bb['blue']
+        append = moves.append
 
-    def get_valid_moves(self, row_from, col_from, moves_check, board, color):
+        offset = COLOR_OFFSET[color]
 
-        if color == 'blue':
-            opponent = 'red'
-        if color == 'red':
-            opponent = 'blue'
+        for piece_type, targets in enumerate(self._TARGETS):
+            pieces = self._piece_bb[offset + piece_type]
 
-        updated_avail_moves = moves_check
-        empty = "       "
-        start_pos = board.get_piece(row_from, col_from)
+            if not pieces:
+                continue
 
-        for i in range(len(updated_avail_moves) - 1, -1, -1):
-            for x, y in updated_avail_moves:
+            for square in _bits(pieces):
+                for target in targets(self, square, color, enemy):
+                    if occupied >> target & 1:
+                        append(square | target << MOVE_TO_SHIFT | MOVE_CAPTURE)
+                    else:
+                        append(square | target << MOVE_TO_SHIFT)
 
-                if type(board.get_piece(row_from, col_from)) == str:
-                    old_pos = empty
+        return moves
 
-                else:
-                    old_pos = board.get_piece(x, y)
+    def get_mobility(self, color):
+        '''
+        Counts the moves of a player's horses, elephants, chariots and cannons, whether or not they leave the
+        general in check.
 
-                board.set_piece(x, y, board.get_piece(row_from, col_from))
-                board.set_piece(row_from, col_from, empty)
+        Receives: the player's color
+        Returns: the number of moves
+        '''
 
-                if self.is_in_check(color):
-                    updated_avail_moves.remove((x, y))
+        enemy = self._color_bb[opposite(color)]
+        offset = COLOR_OFFSET[color]
+        count = 0
 
-                board.set_piece(x, y, old_pos)
-                board.set_piece(row_from, col_from, start_pos)
+        for piece_type in (HORSE, ELEPHANT, CHARIOT, CANNON):
+            targets = self._TARGETS[piece_type]
 
-        if len(updated_avail_moves) == 0 and self.is_in_check(color):
-            if color == "blue":
-                self._game_state = "RED_WON"
-            else:
-                self._game_state = "BLUE_WON"
+            for square in _bits(self._piece_bb[offset + piece_type]):
+                count += len(targets(self, square, color, enemy))
 
-        return updated_avail_moves
+        return count
 
-    def convert_move_col(self, move):
+    def is_square_attacked(self, row, col, by_color):
         '''
-        Method that converts letter (a-i) to the corresponding list index number
-        for the move parameter for the row index on the board. Given that things are in algebraic notation.
+        Method that determines whether a piece of the given color could move to the square, capturing whatever is
+        on it. Works backwards from the square and stops at the first attacker found, instead of generating every
+        move of the attacking side.
 
-        Recieves: the col we are moving from/to
-        Returns: an integer value that corresponds with the letter so that we can manipulate list indices
+        Goes by the same piece rules as the move generators above, so the square should not hold one of
+        by_color's own pieces. As in those rules the general and guard only move onto empty points, so they
+        attack empty palace points but never a piece.
+
+        Receives: row, col of the square and the color of the attacking pieces
+        Returns: True or False depending on if the square is attacked
         '''
 
-        temp_move = move[0]
-        new_move = None
+        square = row * BOARD_COLS + col
+        own = self._color_bb[by_color]
+        occupied = self._color_bb['red'] | self._color_bb['blue']
+        piece_bb = self._piece_bb
+        offset = COLOR_OFFSET[by_color]
 
-        if temp_move == "a":
-            new_move = 0
+        # soldiers on the neighbouring squares they could step from
+        soldiers = piece_bb[offset + SOLDIER]
 
-        if temp_move == "b":
-            new_move = 1
+        if soldiers:
+            for origin in SOLDIER_ORIGINS[by_color][square]:
+                if soldiers >> origin & 1:
+                    return True
 
-        if temp_move == "c":
-            new_move = 2
+        # horses and elephants whose blocking points are empty
+        horses = piece_bb[offset + HORSE]
 
-        if temp_move == "d":
-            new_move = 3
+        if horses:
+            for origin, block in HORSE_ORIGINS[square]:
+                if horses >> origin & 1 and not occupied >> block & 1:
+                    return True
 
-        if temp_move == "e":
-            new_move = 4
+        elephants = piece_bb[offset + ELEPHANT]
 
-        if temp_move == "f":
-            new_move = 5
+        if elephants:
+            for origin, first_block, second_block in ELEPHANT_ORIGINS[square]:
+                if elephants >> origin & 1 and not occupied >> first_block & 1 and not occupied >> second_block & 1:
+                    return True
 
-        if temp_move == "g":
-            new_move = 6
+        chariots = piece_bb[offset + CHARIOT]
+        cannons = piece_bb[offset + CANNON]
+        all_cannons = cannons | piece_bb[COLOR_OFFSET[opposite(by_color)] + CANNON]
 
-        if temp_move == "h":
-            new_move = 7
+        for ray, mask, step in ORTH_RAYS[square]:
 
-        if temp_move == "i":
-            new_move = 8
+            # a chariot only stops at a piece of its own color, so the first of by_color's pieces on the ray
+            # attacks the square if it is a chariot
+            if chariots:
+                blockers = own & mask
 
-        return new_move
+                if blockers:
+                    if step > 0:
+                        nearest = (blockers & -blockers).bit_length() - 1
+                    else:
+                        nearest = blockers.bit_length() - 1
 
-    def convert_move_row(self, move):
-        '''
-        Method that converts the string into an int to pass to make_move method to designate
-        the row in which to move from. Given that things are in algebraic notation.
+                    if chariots >> nearest & 1:
+                        return True
 
-        Recieves: the row we are moving from/to
-        Returns: an integer value that corresponds with the col number to manipulate the index to move from
-        '''
+            # a cannon needs the first piece out from the square as a screen. past the screen it moves through the
+            # other color's pieces, so the first of by_color's pieces past the screen attacks if it is a cannon
+            if cannons and occupied & mask:
+                for index, screen in enumerate(ray):
+                    if occupied >> screen & 1:
+                        break
+
+                if all_cannons >> screen & 1:
+                    continue
+
+                for beyond in ray[index + 1:]:
+                    if own >> beyond & 1:
+                        if cannons >> beyond & 1:
+                            return True
+                        break
 
-        row_temp = move[1:]
-        new_row_move = None
+        palace = PALACE[square]
 
-        if row_temp == "1":
-            new_row_move = 0
+        if palace == by_color:
 
-        if row_temp == "2":
-            new_row_move = 1
+            # the cannon's jump between opposite corners of its own palace
+            jump = CANNON_PALACE_JUMPS[square]
 
-        if row_temp == "3":
-            new_row_move = 2
+            if cannons and jump is not None and cannons >> jump[0] & 1 and \
+                    occupied >> PALACE_CENTER[palace] & 1 and occupied >> PALACE_CENTER['blue'] & 1:
+                for neighbour in CANNON_PALACE_JUMPS[jump[0]][1]:
+                    if not own >> neighbour & 1:
+                        return True
 
-        if row_temp == "4":
-            new_row_move = 3
+            # the chariot along the palace diagonals, and the general and guard, only move onto empty points
+            if not occupied >> square & 1:
+                for ray in PALACE_DIAGONAL_RAYS[square]:
+                    for step in ray:
+                        if own >> step & 1:
+                            if chariots >> step & 1:
+                                return True
+                            break
 
-        if row_temp == "5":
-            new_row_move = 4
+                palace_pieces = piece_bb[offset + GENERAL] | piece_bb[offset + GUARD]
 
-        if row_temp == "6":
-            new_row_move = 5
+                for step in PALACE_STEPS[square]:
+                    if palace_pieces >> step & 1:
+                        return True
 
-        if row_temp == "7":
-            new_row_move = 6
+        return False
 
-        if row_temp == "8":
-            new_row_move = 7
+# padded mailbox layout -- the 10x9 board sits in the middle of a 16x15 grid of cells with a border three cells
+# wide, enough for the longest elephant jump. a walk along a line or a horse or elephant jump stops at a border cell
+# instead of testing the edges of the board, and the palace flags are looked up by cell.
+MAILBOX_PAD = 3
+MAILBOX_COLS = BOARD_COLS + 2 * MAILBOX_PAD
+MAILBOX_CELLS = (BOARD_ROWS + 2 * MAILBOX_PAD) * MAILBOX_COLS
 
-        if row_temp == "9":
-            new_row_move = 8
+# cell of each square, and square of each cell (-1 for the border)
+MAILBOX_CELL = tuple((row + MAILBOX_PAD) * MAILBOX_COLS + col + MAILBOX_PAD for row, col in COORDS)
+MAILBOX_SQUARE = tuple(MAILBOX_CELL.index(cell) if cell in MAILBOX_CELL else -1 for cell in range(MAILBOX_CELLS))
 
-        if row_temp == "10":
-            new_row_move = 9
+# what a cell holds: BORDER, EMPTY_CELL, or the code of the piece on it plus one
+BORDER = -1
+EMPTY_CELL = 0
 
-        return new_row_move
+# the color of the palace each cell is in, and whether it is a corner or center with the diagonal palace lines
+CELL_PALACE = tuple(PALACE[square] if square >= 0 else None for square in MAILBOX_SQUARE)
+CELL_PALACE_POINT = tuple(square >= 0 and COORDS[square] in _PALACE_POINTS for square in MAILBOX_SQUARE)
 
-    def piece_to_player(self, row_from, col_from):
+MAILBOX_ORTH = tuple(x_movement * MAILBOX_COLS + y_movement for x_movement, y_movement in _ORTH)
+MAILBOX_DIAG = tuple(x_movement * MAILBOX_COLS + y_movement for x_movement, y_movement in _DIAG)
+
+# (block, destination) offsets for the horse and (first block, second block, destination) for the elephant
+MAILBOX_HORSE = tuple((x_movement * MAILBOX_COLS + y_movement,
+                       (x_movement + x_diagonal) * MAILBOX_COLS + y_movement + y_diagonal)
+                      for x_movement, y_movement in _ORTH for x_diagonal, y_diagonal in _DIAG
+                      if x_movement * x_diagonal > 0 or y_movement * y_diagonal > 0)
+MAILBOX_ELEPHANT = tuple((block, destination, 2 * destination - block) for block, destination in MAILBOX_HORSE)
+
+# sideways and forward for the soldier, forward being up the board for blue and down for red
+MAILBOX_SOLDIER = {'blue': (-1, 1, -MAILBOX_COLS), 'red': (-1, 1, MAILBOX_COLS)}
+
+
+class MailboxBoard(Board):
+    '''
+    A board that also keeps its pieces in a padded mailbox -- a flat list of cells with a border around the board --
+    and generates moves by walking the cells. Gives the same moves as Board. Board's bitboards and hash are still
+    kept, since checks and the zobrist hash are worked out from them.
+
+    Can be used in place of Board with JanggiGame(board_class=MailboxBoard), and is there to compare the two layouts.
+    '''
+
+    def __init__(self):
         '''
-        Method that tests to see if the player attempting to move the piece controls the piece.
+        The init method for the mailbox board, an empty board with the border cells filled in.
 
-        Recieves: row and column location of the piece player is attempting to move.
-        Returns: True or False depending on whether it is the player's piece they are attempting to move.
+        Recieves: none
+        Returns: none
         '''
 
-        # gets the board and gets the pieces
-        get_piece = self._board.get_piece(row_from, col_from)
+        super().__init__()
 
-        player = get_piece.get_player()
+        self._cells = [BORDER if square < 0 else EMPTY_CELL for square in MAILBOX_SQUARE]
 
-        # blue will be odd numbers
-        if self._turn % 2 != 0 and player == "blue":
-            return True
+    def get_piece(self, row, col):
+        '''
+        Get method that takes the row and column index that the piece is located at as parameters.
 
-        if self._turn % 2 == 0 and player == "red":
-            return True
+        Recieves: row and col as parameters to determine where in the index the piece is.
+        Returns: the piece at the specified location
+        '''
+
+        cell = self._cells[MAILBOX_CELL[row * BOARD_COLS + col]]
+
+        if cell > EMPTY_CELL:
+            return PIECES[cell - 1]
+
+        return EMPTY
+
+    def set_piece(self, row, col, piece):
+        '''
+        Set method that takes the row and column index to be changed, and the piece to be move as parameters
+        and sets the new position of the piece.
+
+        Recieves: row, col, and the piece object as parameters.
+        Returns: sets the piece object at the specified location.
+        '''
 
+        super().set_piece(row, col, piece)
+
+        if type(piece) == str:
+            self._cells[MAILBOX_CELL[row * BOARD_COLS + col]] = EMPTY_CELL
         else:
-            return False
+            self._cells[MAILBOX_CELL[row * BOARD_COLS + col]] = piece.get_code() + 1
 
-    def make_move(self, move_from, move_to):
+    # the target methods below give the same squares as Board's, walking the cells until the border. a cell holds a
+    # piece of the color moving when it is between low and high, the codes of that color plus one.
+
+    def _palace_targets(self, square, color, capturable):
+        '''
+        Target squares for the general and guard, one point along the palace lines onto an empty point of their own
+        palace.
         '''
-        Method that moves the pieces.
 
-        Determines if a valid move has been made. For example, if the square being moved from does not contain
-        a piece belonging ot the player whose turn it is, or if the indicated move is not legal, or if the game
-        has already been won. Should return false if any of these occur.
+        cell = MAILBOX_CELL[square]
 
-        If move is valid, then it should make the indicated move, remove any captured piece, update the game state,
-        and update whose turn it is.
+        if CELL_PALACE[cell] != color:
+            return []
 
-        Recieves: move_from and move_to arguments to determine where to move from and to.
-        Returns: either true or false depending on if a valid move is made
+        cells = self._cells
+        directions = MAILBOX_ORTH
+
+        if CELL_PALACE_POINT[cell]:
+            directions = MAILBOX_DIAG + MAILBOX_ORTH
+
+        return [MAILBOX_SQUARE[cell + direction] for direction in directions
+                if CELL_PALACE[cell + direction] == color and cells[cell + direction] == EMPTY_CELL]
+
+    def _horse_targets(self, square, color, capturable):
+        '''
+        Target squares for the horse, one point orthogonally and one outward diagonally, blocked by a piece on the
+        first point.
         '''
 
-        # converts algebraic movement to list indices
-        row_from = self.convert_move_row(move_from)
-        col_from = self.convert_move_col(move_from)
-        row_to = self.convert_move_row(move_to)
-        col_to = self.convert_move_col(move_to)
+        cell = MAILBOX_CELL[square]
+        cells = self._cells
+        moves = []
 
-        # gets the board and gets the pieces
-        get_piece = self._board.get_piece(row_from, col_from)
-        occupied_dict = self._board.get_occupied()
+        for block, destination in MAILBOX_HORSE:
+            if cells[cell + block] == EMPTY_CELL:
+                target = cells[cell + destination]
 
-        # returns false if the game has already been won
-        if self._game_state != "UNFINISHED":
-            return False
+                if target == EMPTY_CELL or \
+                        target > EMPTY_CELL and capturable >> MAILBOX_SQUARE[cell + destination] & 1:
+                    moves.append(MAILBOX_SQUARE[cell + destination])
 
-        # if player wants to pass their turn, they input the same rows and columns for both moves
-        # handles if the space is empty and the player wants to pass
-        if type(get_piece) == str and row_from == row_to and col_from == col_to:
-            self._turn += 1
-            return True
+        return moves
 
-        # if the player attempts to move an empty space, will return False as an invalid move and not update
-        # turn counter
-        if type(get_piece) == str:
-            return False
+    def _elephant_targets(self, square, color, capturable):
+        '''
+        Target squares for the elephant, one point orthogonally and two outward diagonally, blocked by a piece on
+        either of the first two points.
+        '''
 
-        piece = get_piece.get_piece_name()
+        cell = MAILBOX_CELL[square]
+        cells = self._cells
+        moves = []
 
-        # finds out whose turn it is
-        if self._turn % 2 != 0:
-            players_turn = 'blue'
-        if self._turn % 2 == 0:
-            players_turn = 'red'
+        for first_block, second_block, destination in MAILBOX_ELEPHANT:
+            if cells[cell + first_block] == EMPTY_CELL and cells[cell + second_block] == EMPTY_CELL:
+                target = cells[cell + destination]
 
-        if players_turn == 'blue':
-            opposite_color = 'red'
-        if players_turn == 'red':
-            opposite_color = 'blue'
+                if target == EMPTY_CELL or \
+                        target > EMPTY_CELL and capturable >> MAILBOX_SQUARE[cell + destination] & 1:
+                    moves.append(MAILBOX_SQUARE[cell + destination])
 
-        # gets the list of capturable pieces, all available moves of the piece, and whether the attempted move is valid
-        capture = get_piece.check_capture(row_to, col_to, self._board, players_turn)
-        moves_check = get_piece.check_moves(row_from, col_from, self._board, players_turn, capture)
-        updated_moves = self.get_valid_moves(row_from, col_from, moves_check, self._board, players_turn)
-        valid_moves = get_piece.is_valid(row_to, col_to, updated_moves)
+        return moves
 
-        # tests if there is a piece to be moved or if space is empty
-        if type(get_piece) == str and row_from != row_to and col_from != col_to:
-            return False
+    def _chariot_targets(self, square, color, capturable):
+        '''
+        Target squares for the chariot, any distance orthogonally until a piece of its own color, and along the
+        diagonal lines of its own palace.
+        '''
 
-        # if move from is the same as move to the player passes their turn
-        if row_from == row_to and col_from == col_to:
-            self._turn += 1
-            return True
+        cell = MAILBOX_CELL[square]
+        cells = self._cells
+        low = COLOR_OFFSET[color] + 1
+        high = low + len(PIECE_NAMES) - 1
+        moves = []
 
-        if not self.piece_to_player(row_from, col_from):
-            return False
+        for direction in MAILBOX_ORTH:
+            target = cell + direction
 
-        empty = "       "
+            while cells[target] != BORDER and not low <= cells[target] <= high:
+                moves.append(MAILBOX_SQUARE[target])
+                target += direction
 
-        # if the move is valid and the piece to be moved is controlled by the player whose turn it is,
-        # move the piece and empty the space it was previously in and update the board
-        if self.piece_to_player(row_from, col_from) is True and valid_moves is True:
-            move_piece = self._board.set_piece(row_to, col_to, get_piece)
-            empty_previous_spot = self._board.set_piece(row_from, col_from, empty)
+        if CELL_PALACE[cell] == color and CELL_PALACE_POINT[cell]:
+            for direction in MAILBOX_DIAG:
+                target = cell + direction
 
-            checkmate = self.is_in_checkmate(opposite_color)
+                while CELL_PALACE[target] == color and not low <= cells[target] <= high:
+                    if cells[target] == EMPTY_CELL:
+                        moves.append(MAILBOX_SQUARE[target])
 
-            # if the player is in check, tests to see if that player is also in checkmate
-            # if so it updates the game state to which player won
-            if self.is_in_check(opposite_color) and players_turn == 'blue' and checkmate:
-                self._game_state = "BLUE_WON"
+                    target += direction
 
-            if self.is_in_check(opposite_color) and players_turn == 'red' and checkmate:
-                self._game_state = "RED_WON"
+        return moves
 
-            # updates the turn counter if the move was valid and returns True
-            self._turn += 1
-            return True
+    def _cannon_targets(self, square, color, capturable):
+        '''
+        Target squares for the cannon, jumping orthogonally over a piece that is not a cannon onto an empty square or
+        a piece of the other color, and from a corner of its own palace to the opposite corner over the center.
+        '''
 
-        # returns False if move invalid
-        else:
-            return False
+        cell = MAILBOX_CELL[square]
+        cells = self._cells
+        low = COLOR_OFFSET[color] + 1
+        high = low + len(PIECE_NAMES) - 1
+        cannons = (COLOR_OFFSET['red'] + CANNON + 1, COLOR_OFFSET['blue'] + CANNON + 1)
+        moves = []
+
+        for direction in MAILBOX_ORTH:
+            screen = cell + direction
+
+            # every piece up to and including the first of its own color can be jumped over
+            while cells[screen] != BORDER:
+                if cells[screen] == EMPTY_CELL:
+                    screen += direction
+                    continue
+
+                if cells[screen] not in cannons:
+                    jump = screen + direction
+
+                    while cells[jump] != BORDER:
+                        if cells[jump] == EMPTY_CELL:
+                            moves.append(MAILBOX_SQUARE[jump])
+                            jump += direction
+                            continue
+
+                        if not low <= cells[jump] <= high:
+                            moves.append(MAILBOX_SQUARE[jump])
+                        break
+
+                if low <= cells[screen] <= high:
+                    break
+
+                screen += direction
+
+        # the palace jump needs both the cannon's palace center and the blue palace center to be occupied, and is
+        # there while either palace point next to the corner is free of the cannon's own pieces
+        palace = CELL_PALACE[cell]
+
+        if palace == color and CANNON_PALACE_JUMPS[square] is not None and \
+                cells[MAILBOX_CELL[PALACE_CENTER[palace]]] != EMPTY_CELL and \
+                cells[MAILBOX_CELL[PALACE_CENTER['blue']]] != EMPTY_CELL:
+            for direction in MAILBOX_ORTH:
+                if CELL_PALACE[cell + direction] == palace and not low <= cells[cell + direction] <= high:
+                    moves.append(CANNON_PALACE_JUMPS[square][0])
+                    break
+
+        return moves
+
+    def _soldier_targets(self, square, color, capturable):
+        '''
+        Target squares for the soldier, one point sideways or forward onto a square without a piece of its own color.
+        '''
+
+        cell = MAILBOX_CELL[square]
+        cells = self._cells
+        low = COLOR_OFFSET[color] + 1
+        high = low + len(PIECE_NAMES) - 1
+
+        return [MAILBOX_SQUARE[cell + direction] for direction in MAILBOX_SOLDIER[color]
+                if cells[cell + direction] != BORDER and not low <= cells[cell + direction] <= high]
+
+    # target methods by piece type
+    _TARGETS = (_palace_targets, _palace_targets, _horse_targets, _elephant_targets, _chariot_targets,
+                _cannon_targets, _soldier_targets)
+
+# ------------------------------GAME-------------------------------------#
+
+class MoveResult(Enum):
+    '''
+    What happened to a move passed to JanggiGame.play_move -- it was made, or the reason it was refused. The values
+    are the names, so a result can be sent as text.
+    '''
+
+    MOVED = "MOVED"
+    PASSED = "PASSED"
+    INVALID_SQUARE = "INVALID_SQUARE"
+    GAME_OVER = "GAME_OVER"
+    EMPTY_SQUARE = "EMPTY_SQUARE"
+    NOT_YOUR_PIECE = "NOT_YOUR_PIECE"
+    ILLEGAL_MOVE = "ILLEGAL_MOVE"
+    LEAVES_GENERAL_IN_CHECK = "LEAVES_GENERAL_IN_CHECK"
+
+    def is_accepted(self):
+        '''
+        Returns True if the move or pass was made, which is what make_move returns.
+        '''
+
+        return self is MoveResult.MOVED or self is MoveResult.PASSED
+
+
+class JanggiGame:
+    '''
+    Class that starts the game.
+
+    Will interact with the board and ChessPiece classes due to updating the game as it progresses.
+    Will need to interact with the Board class to get the board and the ChessPiece class to get and set the
+    pieces on the board.
+
+    Will handle input, player movement, determining the game state,
+    determining if a player is in check/checkmate, which player's turn it is, and convert strings for movement
+    to numerical indices.
+    '''
+
+    def __init__(self, board_class=Board, board=None):
+        '''
+        The init method that for the JanggiGame class that initializes all data members.
+
+        Recieves: the board class to play on as a default parameter, Board or MailboxBoard, and a board that already
+        has its pieces on it as a default parameter to play from instead of the starting setup
+        Returns: none
+        '''
+
+        self._turn = 1
+
+        self._game_state = "UNFINISHED"
+
+        # whether the game was ended by a resignation, which undo can not take back
+        self._resigned = False
+
+        # creates the board
+        if board is None:
+            self._board = board_class()
+            self._board.create_board()
+        else:
+            self._board = board
+
+        # undo records for the moves made so far, the most recent last
+        self._history = []
+
+        # legal move lists already worked out for the current position, by color, and the hash of that position
+        self._legal_cache = {}
+        self._legal_cache_hash = None
+
+        # array('H') move buffers reused by perft, one for each depth
+        self._move_buffers = []
+
+    def get_game_state(self):
+        '''
+        Get method that returns the game state.
+
+        Recieves: none
+        Returns: the game state
+        '''
+
+        return self._game_state
+
+    def freeze(self):
+        '''
+        Packs the game into a few hundred bytes that thaw turns back into the same game, for keeping games that are
+        not being played without holding their boards. After the header come two bytes for each piece, its square and
+        code, then the moves made as packed integers, then one byte for each move with the code of the piece it
+        captured plus one (0 for none) and, in the top bits, the game state before it, so the moves can still be
+        taken back.
+
+        Recieves: none
+        Returns: the bytes. Raises ValueError if the turn is past what the 32 bit turn can hold.
+        '''
+
+        if self._turn > 0xFFFFFFFF:
+            raise ValueError("turn " + str(self._turn) + " is too high to freeze")
+
+        board = self._board
+        history = self._history
+        squares = board.get_bitboard()
+
+        state = GAME_STATES.index(self._game_state) | (FROZEN_RESIGNED if self._resigned else 0)
+        frozen = bytearray(_FROZEN_HEADER.pack(FROZEN_VERSION, self._turn, state, bin(squares).count("1"),
+                                               len(history)))
+
+        for square in _bits(squares):
+            frozen.append(square)
+            frozen.append(board.get_piece(*COORDS[square]).get_code())
+
+        moves = array('H', [record[0] for record in history])
+
+        if sys.byteorder == "big":
+            moves.byteswap()
+
+        frozen += moves.tobytes()
+        frozen += bytes((0 if type(captured) == str else captured.get_code() + 1) | GAME_STATES.index(state) << 4
+                        for move, captured, turn, state in history)
+
+        return bytes(frozen)
+
+    @classmethod
+    def thaw(cls, frozen, board_class=Board):
+        '''
+        Makes the game back from the bytes freeze gave, with its moves, turn and game state.
+
+        Recieves: the bytes, and the board class to play on as a default parameter. Raises ValueError if the bytes
+        are not a frozen game.
+        Returns: the game
+        '''
+
+        if len(frozen) < _FROZEN_HEADER.size:
+            raise ValueError("too short to be a frozen game")
+
+        version, turn, state, piece_count, move_count = _FROZEN_HEADER.unpack_from(frozen, 0)
+        offset = _FROZEN_HEADER.size
+
+        if version != FROZEN_VERSION or len(frozen) != offset + 2 * piece_count + 3 * move_count:
+            raise ValueError("not a version " + str(FROZEN_VERSION) + " frozen game")
+
+        resigned = bool(state & FROZEN_RESIGNED)
+        state &= ~FROZEN_RESIGNED
+
+        if state >= len(GAME_STATES):
+            raise ValueError("unknown game state " + str(state) + " in a frozen game")
+
+        board = board_class()
+
+        for index in range(offset, offset + 2 * piece_count, 2):
+            if frozen[index] >= len(COORDS) or frozen[index + 1] >= len(PIECES):
+                raise ValueError("bad square or piece code at byte " + str(index) + " of a frozen game")
+
+            row, col = COORDS[frozen[index]]
+            board.set_piece(row, col, PIECES[frozen[index + 1]])
+
+        offset += 2 * piece_count
+
+        moves = array('H')
+        moves.frombytes(frozen[offset:offset + 2 * move_count])
+
+        if sys.byteorder == "big":
+            moves.byteswap()
+
+        offset += 2 * move_count
+
+        game = cls(board_class, board)
+        game._turn = turn
+        game._game_state = GAME_STATES[state]
+        game._resigned = resigned
+
+        for index, move in enumerate(moves):
+            captured = frozen[offset + index] & 0xF
+            square_from, square_to = move_squares(move)
+
+            if square_from >= len(COORDS) or square_to >= len(COORDS) or captured > len(PIECES) or \
+                    frozen[offset + index] >> 4 >= len(GAME_STATES):
+                raise ValueError("bad move " + str(index + 1) + " in a frozen game")
+
+            game._history.append((move, PIECES[captured - 1] if captured else EMPTY, turn - move_count + index,
+                                  GAME_STATES[frozen[offset + index] >> 4]))
+
+        return game
+
+    @classmethod
+    def from_position(cls, position, board_class=Board):
+        '''
+        Makes a game that starts from a position string written by to_position, such as START_POSITION, instead of
+        from the starting setup. The game state is worked out from the position -- if the player to move is in
+        checkmate the other player has won. The game has no moves to undo.
+
+        Recieves: the position string, and the board class to play on as a default parameter. Raises ValueError if
+        the string is not a position, a row has too few or too many squares, or a side does not have one general.
+        Returns: the game
+        '''
+
+        fields = position.split()
+
+        if len(fields) != 3:
+            raise ValueError("a position has three parts, the pieces, the side to move and the turn: " +
+                             repr(position))
+
+        placement, side, turn = fields
+        rows = placement.split("/")
+
+        if len(rows) != BOARD_ROWS:
+            raise ValueError("a position has " + str(BOARD_ROWS) + " rows, not " + str(len(rows)))
+
+        board = board_class()
+
+        for row, text in enumerate(rows):
+            col = 0
+
+            for letter in text:
+                if letter in "123456789":
+                    col += int(letter)
+                elif letter not in LETTER_PIECES:
+                    raise ValueError("unknown piece " + repr(letter) + " in row " + str(row + 1))
+                else:
+                    if col < BOARD_COLS:
+                        board.set_piece(row, col, LETTER_PIECES[letter])
+
+                    col += 1
+
+                if col > BOARD_COLS:
+                    raise ValueError("row " + str(row + 1) + " has more than " + str(BOARD_COLS) + " squares")
+
+            if col != BOARD_COLS:
+                raise ValueError("row " + str(row + 1) + " does not have " + str(BOARD_COLS) + " squares")
+
+        # check and checkmate are worked out from the general, so each side needs exactly one
+        for color in ('blue', 'red'):
+            generals = bin(board.get_bitboard(color, 'General')).count("1")
+
+            if generals != 1:
+                raise ValueError("a position needs one " + color + " general, not " + str(generals))
+
+        if side not in ("b", "r") or not turn.isdigit() or not 1 <= int(turn) <= MAX_TURN:
+            raise ValueError("the side to move is b or r and the turn a number from 1 to " + str(MAX_TURN) + ": " +
+                             repr(side + " " + turn))
+
+        # blue moves on odd turns and red on even turns
+        if (side == "b") != (int(turn) % 2 == 1):
+            raise ValueError("it is not " + ("blue" if side == "b" else "red") + "'s move on turn " + turn)
+
+        game = cls(board_class, board)
+        game._turn = int(turn)
+
+        color = game.get_players_turn()
+
+        if game.is_in_checkmate(color):
+            if color == 'blue':
+                game._game_state = "RED_WON"
+            else:
+                game._game_state = "BLUE_WON"
+
+        return game
+
+    def to_position(self):
+        '''
+        Writes the position out as a string from_position can read back. Rows go from row 1 to row 10 split by '/',
+        with a digit for each run of empty squares and a letter for each piece -- G general, A guard, E elephant,
+        H horse, R chariot, C cannon, S soldier, upper case for blue and lower case for red. Then comes 'b' or 'r'
+        for the side to move and the turn number, as in START_POSITION. A game won by capturing the general, after
+        the other player passed while in check, writes a position from_position will not read, since it has one
+        general.
+
+        Recieves: none
+        Returns: the position string
+        '''
+
+        rows = []
+
+        for row in range(BOARD_ROWS):
+            text = ""
+            empty = 0
+
+            for col in range(BOARD_COLS):
+                piece = self._board.get_piece(row, col)
+
+                if type(piece) == str:
+                    empty += 1
+                    continue
+
+                if empty:
+                    text += str(empty)
+                    empty = 0
+
+                text += PIECE_LETTERS[piece.get_code()]
+
+            if empty:
+                text += str(empty)
+
+            rows.append(text)
+
+        return "/".join(rows) + " " + self.get_players_turn()[0] + " " + str(self._turn)
+
+    def get_board(self):
+        '''
+        Get method for the board the game is played on.
+
+        Recieves: none
+        Returns: the Board object
+        '''
+
+        return self._board
+
+    def get_hash(self):
+        '''
+        Get method for the zobrist hash of the position, the board's hash with the side to move key mixed in when it
+        is red's turn. Passing only changes the side to move, so it changes the hash too.
+
+        Recieves: none
+        Returns: the hash as a 64 bit integer
+        '''
+
+        if self._turn % 2 == 0:
+            return self._board.get_hash() ^ ZOBRIST_RED_TO_MOVE
+
+        return self._board.get_hash()
+
+    def push_move(self, row_from, col_from, row_to, col_to):
+        '''
+        Makes a move on the board without checking that it is legal, and saves what is needed to take it back with
+        pop_move. The same square for both the from and to coordinates is a pass.
+
+        Recieves: row, col of the square to move from and row, col of the square to move to
+        Returns: none
+        '''
+
+        square_from = row_from * BOARD_COLS + col_from
+        square_to = row_to * BOARD_COLS + col_to
+
+        if square_from == square_to:
+            self.push_packed(encode_move(square_from, square_to, MOVE_PASS))
+        else:
+            self.push_packed(encode_move(square_from, square_to))
+
+    def push_packed(self, move):
+        '''
+        The same as push_move for a move packed with encode_move.
+
+        Recieves: the packed move
+        Returns: none
+        '''
+
+        board = self._board
+        row_from, col_from = COORDS[move & MOVE_SQUARE_MASK]
+        row_to, col_to = COORDS[move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK]
+        captured = board.get_piece(row_to, col_to)
+
+        # undo record of the move, the piece on the destination and the turn and game state before the move
+        self._history.append((move, captured, self._turn, self._game_state))
+
+        if not move & MOVE_PASS:
+            board.set_piece(row_to, col_to, board.get_piece(row_from, col_from))
+            board.set_piece(row_from, col_from, EMPTY)
+
+        self._turn += 1
+
+    def pop_move(self):
+        '''
+        Takes back the last move made with push_move, putting back any captured piece and the turn and game state.
+
+        Recieves: none
+        Returns: none
+        '''
+
+        move, captured, turn, game_state = self._history.pop()
+
+        if not move & MOVE_PASS:
+            row_from, col_from = COORDS[move & MOVE_SQUARE_MASK]
+            row_to, col_to = COORDS[move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK]
+            self._board.set_piece(row_from, col_from, self._board.get_piece(row_to, col_to))
+            self._board.set_piece(row_to, col_to, captured)
+
+        self._turn = turn
+        self._game_state = game_state
+
+    def get_move_history(self):
+        '''
+        Get method for the moves and passes made so far.
+
+        Recieves: none
+        Returns: an array('H') of the packed moves, the first move first
+        '''
+
+        return array('H', [record[0] for record in self._history])
+
+    def undo(self):
+        '''
+        Takes back the last move or pass made with make_move. A resignation can not be taken back, so nothing is once
+        a player has resigned.
+
+        Recieves: none
+        Returns: True if a move was taken back, False if there are no moves to take back or a player has resigned
+        '''
+
+        if not self._history or self._resigned:
+            return False
+
+        self.pop_move()
+        return True
+
+    def all_moves(self, color):
+        '''
+        Returns a list of all available moves for the pieces of the player opposing color, the squares they can move
+        to or capture on. Whether a move leaves that player's own general in check is not tested.
+
+        Recieves: the players turn (color) as a parameter
+        Returns: list of all available moves for the opposing player's pieces, one (row, col) destination per move
+        '''
+
+        moves = self._board.generate_moves(opposite(color), [])
+
+        return [COORDS[move_squares(move)[1]] for move in moves]
+
+    def is_in_check(self, color):
+        '''
+        Method that determines whether a player is in check, by asking the board whether any opposing piece
+        attacks the square the player's general is on. A player whose general has been captured counts as in check.
+
+        Recieves: the players turn (color) as a parameter
+        Returns: either true or false as to whether the player is in check.
+        '''
+
+        if _stats is not None:
+            _stats["is_in_check"] += 1
+
+        general = self._board.get_bitboard(color, 'General')
+
+        if not general:
+            return True
+
+        general_row, general_col = COORDS[general.bit_length() - 1]
+
+        return self._board.is_square_attacked(general_row, general_col, opposite(color))
+
+    def is_in_checkmate(self, color):
+        '''
+        Method that determines whether a move has put the other player in checkmate, meaning they are in check and
+        no move of any of their pieces, whether it moves the general, blocks or captures the attacker, gets them out
+        of it. Moves are tried one at a time and the search stops at the first one that works, so a player who is not
+        in checkmate is usually found out after a few moves.
+
+        Recieves: color of the player to be tested
+        Returns: True or False depending on if checkmate is achieved.
+        '''
+
+        board = self._board
+
+        # a general that has been captured has no moves left
+        general = board.get_bitboard(color, 'General')
+
+        if not general:
+            return True
+
+        if not self.is_in_check(color):
+            return False
+
+        capturable = board.get_squares(opposite(color))
+
+        # the general's own moves are tried first since they are the most likely way out
+        general_square = COORDS[general.bit_length() - 1]
+        pieces = [(general_square, board.get_piece(*general_square))]
+        pieces += [(square, piece) for square, piece in board.iter_occupied(color) if square != general_square]
+        stats = _stats
+
+        for (row_from, col_from), piece in pieces:
+            for row_to, col_to in piece.check_moves(row_from, col_from, board, color, capturable):
+                if stats is not None:
+                    stats["legality_probes"] += 1
+
+                self.push_move(row_from, col_from, row_to, col_to)
+                escaped = not self.is_in_check(color)
+                self.pop_move()
+
+                if escaped:
+                    return False
+
+        return True
+
+    def get_players_turn(self):
+        '''
+        Get method for whose turn it is, blue on odd turns and red on even turns.
+
+        Recieves: none
+        Returns: the color of the player whose turn it is
+        '''
+
+        if self._turn % 2 != 0:
+            return 'blue'
+
+        return 'red'
+
+    def _legal_moves(self, color, moves=None):
+        '''
+        Finds every legal move for a player as packed integers, with a pass last. Moves that would leave the
+        player's general in check are left out.
+
+        Recieves: the player's color, and an array('H') to fill as a default parameter so a buffer can be reused
+        Returns: the array of moves
+        '''
+
+        if moves is None:
+            moves = array('H')
+
+        self._board.generate_moves(color, moves)
+        count = 0
+
+        if _stats is not None:
+            _stats["legality_probes"] += len(moves)
+
+        # keeps the legal moves at the front of the buffer as it goes
+        for move in moves:
+            self.push_packed(move)
+
+            if not self.is_in_check(color):
+                moves[count] = move
+                count += 1
+
+            self.pop_move()
+
+        del moves[count:]
+
+        general = self._board.get_bitboard(color, 'General')
+        pass_square = general.bit_length() - 1 if general else 0
+        moves.append(encode_move(pass_square, pass_square, MOVE_PASS))
+
+        return moves
+
+    def legal_moves(self, color):
+        '''
+        Finds every move make_move would accept from a player in the current position, in one pass over their
+        pieces. A pass is given last, as the square of the player's general for both the from and to square. The
+        list is kept until the position changes, so asking again before the next move costs nothing. Does not change
+        the game state.
+
+        Recieves: the player's color
+        Returns: list of (move_from, move_to) tuples in algebraic notation such as ('b3', 'b10'), empty if the game
+        has already been won
+        '''
+
+        if self._game_state != "UNFINISHED":
+            return []
+
+        position = self._board.get_hash()
+
+        # a move or pass since the last call changes the board hash, except for a pass, which does not change
+        # what either player can do
+        if position != self._legal_cache_hash:
+            self._legal_cache = {}
+            self._legal_cache_hash = position
+
+        moves = self._legal_cache.get(color)
+
+        if moves is None:
+            moves = tuple(move_to_algebraic(move) for move in self._legal_moves(color))
+            self._legal_cache[color] = moves
+
+        return list(moves)
+
+    def _update_game_state(self, color):
+        '''
+        After a player's move, sets the game state to that player having won if the other player is in checkmate.
+
+        Recieves: color of the player who just moved
+        Returns: none
+        '''
+
+        if self.is_in_checkmate(opposite(color)):
+            if color == 'blue':
+                self._game_state = "BLUE_WON"
+            else:
+                self._game_state = "RED_WON"
+
+    def perft(self, depth):
+        '''
+        Counts the positions reached by every sequence of legal moves (passes included) of the given length. Used to
+        check that the move rules have not changed and to time move generation. A game that has been won ends its
+        line early.
+
+        Recieves: the number of moves to look ahead
+        Returns: the number of positions at that depth
+        '''
+
+        if depth == 0:
+            return 1
+
+        if self._game_state != "UNFINISHED":
+            return 0
+
+        while len(self._move_buffers) < depth:
+            self._move_buffers.append(array('H'))
+
+        color = self.get_players_turn()
+        moves = self._legal_moves(color, self._move_buffers[depth - 1])
+
+        # the moves at the last level do not need to be made to be counted
+        if depth == 1:
+            return len(moves)
+
+        nodes = 0
+
+        for move in moves:
+            self.push_packed(move)
+
+            if not move & MOVE_PASS:
+                self._update_game_state(color)
+
+            nodes += self.perft(depth - 1)
+            self.pop_move()
+
+        return nodes
+
+    def perft_divide(self, depth):
+        '''
+        Perft split up by the first move, for narrowing down which move a difference in counts comes from.
+
+        Recieves: the number of moves to look ahead
+        Returns: a dictionary of move string (such as 'b3 b10', or 'pass') : number of positions at that depth
+        '''
+
+        counts = {}
+
+        if depth == 0 or self._game_state != "UNFINISHED":
+            return counts
+
+        color = self.get_players_turn()
+
+        for move in self._legal_moves(color):
+            self.push_packed(move)
+
+            if not move & MOVE_PASS:
+                self._update_game_state(color)
+
+            counts[move_to_string(move)] = self.perft(depth - 1)
+            self.pop_move()
+
+        return counts
+
+    def get_valid_moves(self, row_from, col_from, moves_check, board, color):
+        '''
+        Method that removes the moves that would leave the player's own general in check. Each move is made with
+        push_move, tested, and taken back with pop_move.
+
+        Recieves: row, col of the piece, its list of available moves, the board object, and the player's color
+        Returns: list of the available moves that do not leave the general in check
+        '''
+
+        updated_avail_moves = []
+
+        if _stats is not None:
+            _stats["legality_probes"] += len(moves_check)
+
+        for row_to, col_to in moves_check:
+            self.push_move(row_from, col_from, row_to, col_to)
+
+            if not self.is_in_check(color):
+                updated_avail_moves.append((row_to, col_to))
+
+            self.pop_move()
+
+        return updated_avail_moves
+
+    def convert_move_col(self, move):
+        '''
+        Method that converts letter (a-i) to the corresponding list index number
+        for the move parameter for the row index on the board. Given that things are in algebraic notation.
+
+        Recieves: the col we are moving from/to
+        Returns: an integer value that corresponds with the letter so that we can manipulate list indices. Raises
+        ValueError if the move does not start with a letter a-i.
+        '''
+
+        if not move or move[0] not in COLUMN_INDEX:
+            raise ValueError("not a column: " + repr(move))
+
+        return COLUMN_INDEX[move[0]]
+
+    def convert_move_row(self, move):
+        '''
+        Method that converts the string into an int to pass to make_move method to designate
+        the row in which to move from. Given that things are in algebraic notation.
+
+        Recieves: the row we are moving from/to
+        Returns: an integer value that corresponds with the col number to manipulate the index to move from. Raises
+        ValueError if the move does not end with a row 1-10.
+        '''
+
+        if move[1:] not in ROW_INDEX:
+            raise ValueError("not a row: " + repr(move))
+
+        return ROW_INDEX[move[1:]]
+
+    def piece_to_player(self, row_from, col_from):
+        '''
+        Method that tests to see if the player attempting to move the piece controls the piece.
+
+        Recieves: row and column location of the piece player is attempting to move.
+        Returns: True or False depending on whether it is the player's piece they are attempting to move.
+        '''
+
+        # gets the board and gets the pieces
+        get_piece = self._board.get_piece(row_from, col_from)
+
+        player = get_piece.get_player()
+
+        # blue will be odd numbers
+        if self._turn % 2 != 0 and player == "blue":
+            return True
+
+        if self._turn % 2 == 0 and player == "red":
+            return True
+
+        else:
+            return False
+
+    def play_move(self, move_from, move_to):
+        '''
+        Method that moves the pieces, the same as make_move but saying why a move was refused. The cheap checks come
+        first -- the squares, whether the game is over, a pass, and whose piece it is -- so bad moves are turned away
+        without generating any moves. Only then are the piece's moves generated, and only the one destination is
+        tried to see whether it leaves the player's own general in check.
+
+        Recieves: move_from and move_to arguments to determine where to move from and to.
+        Returns: a MoveResult, MOVED or PASSED if the move was made
+        '''
+
+        # converts algebraic movement to square numbers
+        square_from = SQUARE_INDEX.get(move_from) if type(move_from) == str else None
+        square_to = SQUARE_INDEX.get(move_to) if type(move_to) == str else None
+
+        if square_from is None or square_to is None:
+            return MoveResult.INVALID_SQUARE
+
+        return self._play_squares(square_from, square_to)
+
+    def play_packed(self, move):
+        '''
+        The same as play_move for a move packed with encode_move or parse_transcript, so stored games can be played
+        back without going through strings. A move with the pass flag, or with the same square twice, is a pass.
+
+        Recieves: the packed move
+        Returns: a MoveResult, MOVED or PASSED if the move was made
+        '''
+
+        square_from = move & MOVE_SQUARE_MASK
+        square_to = move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK
+
+        if square_from >= BOARD_SQUARES or square_to >= BOARD_SQUARES:
+            return MoveResult.INVALID_SQUARE
+
+        if move & MOVE_PASS:
+            square_to = square_from
+
+        return self._play_squares(square_from, square_to)
+
+    def _play_squares(self, square_from, square_to):
+        '''
+        The staged checks and the move for play_move and play_packed, once the squares are known.
+
+        Recieves: the square numbers to move from and to
+        Returns: a MoveResult
+        '''
+
+        # times each stage when instrumentation is on
+        stats = _stats
+
+        if stats is not None:
+            stats["make_move"] += 1
+            started = perf_counter_ns()
+
+        # no moves once the game has been won
+        if self._game_state != "UNFINISHED":
+            return MoveResult.GAME_OVER
+
+        row_from, col_from = COORDS[square_from]
+        row_to, col_to = COORDS[square_to]
+
+        # if player wants to pass their turn, they input the same square for both moves
+        if square_from == square_to:
+            self.push_move(row_from, col_from, row_to, col_to)
+            return MoveResult.PASSED
+
+        get_piece = self._board.get_piece(row_from, col_from)
+
+        # if the player attempts to move an empty space it is an invalid move and the turn counter is not updated
+        if type(get_piece) == str:
+            return MoveResult.EMPTY_SQUARE
+
+        if not self.piece_to_player(row_from, col_from):
+            return MoveResult.NOT_YOUR_PIECE
+
+        players_turn = get_piece.get_player()
+
+        if stats is not None:
+            started = _lap(stats, "lookup", started)
+
+        # gets the list of capturable pieces and all available moves of the piece, to see if the destination is one
+        capture = get_piece.check_capture(row_to, col_to, self._board, players_turn)
+        moves_check = get_piece.check_moves(row_from, col_from, self._board, players_turn, capture)
+
+        if stats is not None:
+            started = _lap(stats, "generate", started)
+
+        valid = get_piece.is_valid(row_to, col_to, moves_check)
+
+        if stats is not None:
+            started = _lap(stats, "validate", started)
+
+        if not valid:
+            return MoveResult.ILLEGAL_MOVE
+
+        # makes the move and takes it back if it leaves the player's own general in check
+        if stats is not None:
+            stats["legality_probes"] += 1
+
+        self.push_move(row_from, col_from, row_to, col_to)
+        in_check = self.is_in_check(players_turn)
+
+        if in_check:
+            self.pop_move()
+
+        if stats is not None:
+            started = _lap(stats, "check_test", started)
+
+        if in_check:
+            return MoveResult.LEAVES_GENERAL_IN_CHECK
+
+        # if the other player is in check, tests to see if that player is also in checkmate
+        # if so it updates the game state to which player won
+        self._update_game_state(players_turn)
+
+        if stats is not None:
+            _lap(stats, "checkmate", started)
+
+        return MoveResult.MOVED
+
+    def make_move(self, move_from, move_to):
+        '''
+        Method that moves the pieces.
+
+        Determines if a valid move has been made. For example, if the square being moved from does not contain
+        a piece belonging ot the player whose turn it is, or if the indicated move is not legal, or if the game
+        has already been won. Should return false if any of these occur.
+
+        If move is valid, then it should make the indicated move, remove any captured piece, update the game state,
+        and update whose turn it is.
+
+        Recieves: move_from and move_to arguments to determine where to move from and to.
+        Returns: either true or false depending on if a valid move is made
+        '''
+
+        return self.play_move(move_from, move_to).is_accepted()
+
+    def resign(self, color):
+        '''
+        Method for a player giving up the game, which the other player wins.
+
+        Recieves: the color of the player resigning
+        Returns: True if the game was ended, False if it was already over
+        '''
+
+        if self._game_state != "UNFINISHED":
+            return False
+
+        if color == 'blue':
+            self._game_state = "RED_WON"
+        else:
+            self._game_state = "BLUE_WON"
+
+        self._resigned = True
+
+        return True
 
 # -----------------TESTING------------------#
 if __name__ == '__main__':
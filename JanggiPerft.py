@@ -0,0 +1,148 @@
+# -----------------------------------------------------------------#
+# Description: Perft counts for JanggiGame. Plays a set of known positions, counts every line of play down to a
+#              given depth and checks the totals against stored counts, so a change to the move generation that
+#              changes the rules shows up as a wrong count. Also reports how many positions a second are counted,
+#              to track how fast the move generation is.
+#
+#              Run with: python JanggiPerft.py [--depth N] [--position NAME] [--board LAYOUT] [--divide] [--verify]
+# -----------------------------------------------------------------#
+
+import argparse
+import sys
+import time
+
+from JanggiGame import JanggiGame, Board, MailboxBoard, parse_transcript, move_to_string
+
+# ---------------------------POSITIONS-------------------------#
+
+# each position is a description and the moves played from the start to reach it. a move with the same square twice
+# is a pass.
+POSITIONS = {
+    "opening": ("the starting position", ""),
+    "cannon_check": ("blue cannon checks the red general over a screen, red has to answer",
+                     "c7 c6, a4 a5, a7 b7, a5 a6, b8 b6, a6 a7, b6 e6"),
+    "chariot_palace": ("blue chariot on the corner of the red palace, with the palace diagonals open",
+                       "a10 a9, e2 d2, a9 d9, d2 e2, d9 d8"),
+    "soldier_palace": ("blue soldier inside the red palace next to the general",
+                       "c7 c6, i4 i5, c6 c5, i5 i6, c5 c4, i1 i2, c4 d4, i2 h2, d4 d3, e2 e2"),
+    "cannon_palace": ("blue cannon on the corner of its palace with the general as the screen",
+                      "h10 g8, c1 d3, h8 f8, b3 e3, g7 g6, e3 e3"),
+    "middlegame": ("a middlegame with trades on both sides and open files",
+                   "c7 c6, c1 d3, b10 d7, b3 e3, c10 d8, h1 g3, e7 e6, e3 e6, h8 c8, d3 e5, c8 c4, e5 c4, i10 i8, "
+                   "g4 f4, i8 f8, g3 h5"),
+}
+
+# the number of lines of play from each position at depth 1, 2 and 3
+EXPECTED = {
+    "opening": (32, 1028, 34072),
+    "cannon_check": (7, 318, 9905),
+    "chariot_palace": (30, 1324, 40928),
+    "soldier_palace": (33, 912, 31271),
+    "cannon_palace": (35, 1475, 50243),
+    "middlegame": (47, 2034, 94181),
+}
+
+# the board layouts that can be counted on
+BOARDS = {"bitboard": Board, "mailbox": MailboxBoard}
+
+
+def load_position(name, board_class=Board):
+    '''
+    Sets up one of the stored positions by playing its moves from the start.
+
+    Receives: the name of the position, and the board class to play on as a default parameter
+    Returns: the game in that position. Raises ValueError if the name is unknown or one of the moves is refused.
+    '''
+
+    if name not in POSITIONS:
+        raise ValueError("unknown position " + repr(name))
+
+    game = JanggiGame(board_class)
+
+    for move in parse_transcript(POSITIONS[name][1]):
+        if not game.play_packed(move).is_accepted():
+            raise ValueError("move " + move_to_string(move) + " was refused setting up " + name)
+
+    return game
+
+
+# ---------------------------BENCHMARK-------------------------#
+
+def run_perft(name, depth, board_class=Board):
+    '''
+    Counts the lines of play from a stored position and times it.
+
+    Receives: the name of the position and the depth to count to, and the board class as a default parameter
+    Returns: a tuple of the count and the seconds it took
+    '''
+
+    game = load_position(name, board_class)
+
+    start = time.perf_counter()
+    nodes = game.perft(depth)
+
+    return nodes, time.perf_counter() - start
+
+
+def main(argv=None):
+    '''
+    The command line entry point. Prints the count, the time and the positions a second for each position, and the
+    count per first move with --divide.
+
+    Receives: the command line arguments, the ones the program was run with if none
+    Returns: 0, or 1 with --verify when a count does not match the stored one
+    '''
+
+    parser = argparse.ArgumentParser(description="Perft counts and move generation speed for JanggiGame.")
+    parser.add_argument("--depth", type=int, default=3, help="depth to count to (default 3)")
+    parser.add_argument("--position", choices=sorted(POSITIONS), action="append",
+                        help="position to count, can be given more than once (default all)")
+    parser.add_argument("--board", choices=sorted(BOARDS), default="bitboard",
+                        help="board layout to count on (default bitboard)")
+    parser.add_argument("--divide", action="store_true", help="print the count for each first move")
+    parser.add_argument("--verify", action="store_true", help="fail if a count does not match the stored one")
+    args = parser.parse_args(argv)
+
+    names = args.position or list(POSITIONS)
+    board_class = BOARDS[args.board]
+    total_nodes = 0
+    total_seconds = 0.0
+    mismatches = []
+
+    for name in names:
+        if args.divide:
+            divide = load_position(name, board_class).perft_divide(args.depth)
+
+            print(name + ":")
+
+            for move in sorted(divide):
+                print("  " + move + " " + str(divide[move]))
+
+        nodes, seconds = run_perft(name, args.depth, board_class)
+        total_nodes += nodes
+        total_seconds += seconds
+
+        expected = None
+        if 1 <= args.depth <= len(EXPECTED[name]):
+            expected = EXPECTED[name][args.depth - 1]
+
+        status = ""
+        if expected is not None and nodes != expected:
+            status = "  MISMATCH, expected " + str(expected)
+            mismatches.append(name)
+
+        print("%-16s depth %d  %10d nodes  %8.3f s  %10.0f nodes/s%s"
+              % (name, args.depth, nodes, seconds, nodes / seconds if seconds else 0.0, status))
+
+    print("%-16s depth %d  %10d nodes  %8.3f s  %10.0f nodes/s"
+          % ("total", args.depth, total_nodes, total_seconds, total_nodes / total_seconds if total_seconds else 0.0))
+
+    if args.verify and mismatches:
+        print("counts changed for: " + ", ".join(mismatches))
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
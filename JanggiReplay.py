@@ -0,0 +1,228 @@
+# -----------------------------------------------------------------#
+# Description: Replays stored games through JanggiGame to check them. Games go through a pool of worker processes
+#              in chunks, and a result comes back for each game, in the order the games were given: the game state
+#              at the end, how many moves were made and the first move that was refused, if any.
+#
+#              Run with: python JanggiReplay.py [FILE] [--workers N] [--chunk-size N]
+#              FILE has one game per line written as squares in pairs ('b3 b10 c7 c6 ...'). Without a file, random
+#              games are made up and replayed with 1 worker and then with more, to show the speedup.
+# -----------------------------------------------------------------#
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import deque, namedtuple
+from itertools import islice
+
+from JanggiGame import JanggiGame, MoveResult, format_transcript, parse_transcript
+
+# the result of replaying one game. index is the game's position in the input, plies the number of moves and passes
+# made, and first_illegal and reason the index of the first refused move and the MoveResult value saying why, or
+# None if every move was made. replay stops at the first refused move.
+ReplayResult = namedtuple("ReplayResult", "index game_state plies first_illegal reason")
+
+
+def replay_game(moves):
+    '''
+    Plays one game through from the start.
+
+    Receives: the game's moves, as a transcript string ('b3 b10 c7 c6 ...'), packed moves (such as an array('H')
+    from parse_transcript or get_move_history) or (move_from, move_to) pairs of algebraic strings
+    Returns: a tuple of the game state at the end, the number of moves made, the index of the first refused move and
+    the reason it was refused, the last two None if every move was made
+    '''
+
+    game = JanggiGame()
+
+    if isinstance(moves, str):
+        try:
+            moves = parse_transcript(moves)
+
+        # a transcript with a bad square is played move by move so the result says which move it was
+        except ValueError:
+            names = moves.replace(",", " ").split()
+            moves = [tuple(names[index:index + 2]) for index in range(0, len(names), 2)]
+
+    plies = 0
+
+    for move in moves:
+        if isinstance(move, int):
+            result = game.play_packed(move)
+        elif len(move) == 2:
+            result = game.play_move(move[0], move[1])
+        else:
+            result = MoveResult.INVALID_SQUARE
+
+        if not result.is_accepted():
+            return game.get_game_state(), plies, plies, result.value
+
+        plies += 1
+
+    return game.get_game_state(), plies, None, None
+
+
+def _replay_chunk(games):
+    '''
+    Replays a chunk of games in a worker process.
+
+    Receives: a list of games
+    Returns: a list of replay_game results, one per game
+    '''
+
+    return [replay_game(moves) for moves in games]
+
+
+def _chunks(games, chunk_size):
+    '''
+    Yields the games in lists of chunk_size, the last one possibly shorter, without reading ahead of the chunk.
+    '''
+
+    games = iter(games)
+
+    while True:
+        chunk = list(islice(games, chunk_size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def replay_games(games, workers=None, chunk_size=64):
+    '''
+    Replays many games, spread over a pool of worker processes. Games are read from the iterable a chunk at a time
+    and only a few chunks per worker are out at once, so an iterable of millions of games is never all in memory.
+
+    Receives: an iterable of games in any form replay_game takes, and as default parameters the number of worker
+    processes (the number of CPUs if None, and no pool at all for 1) and the number of games sent to a worker at once
+
+    Returns: a generator of ReplayResult, one per game in the order the games were given
+    '''
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers < 1 or chunk_size < 1:
+        raise ValueError("workers and chunk_size need to be at least 1")
+
+    index = 0
+
+    if workers == 1:
+        for chunk in _chunks(games, chunk_size):
+            for result in _replay_chunk(chunk):
+                yield ReplayResult(index, *result)
+                index += 1
+
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        pending = deque()
+
+        for chunk in _chunks(games, chunk_size):
+            pending.append(pool.apply_async(_replay_chunk, (chunk,)))
+
+            # keeps every worker busy with one chunk queued behind it, and hands back results as they are ready
+            while len(pending) > 2 * workers or (pending and pending[0].ready()):
+                for result in pending.popleft().get():
+                    yield ReplayResult(index, *result)
+                    index += 1
+
+        while pending:
+            for result in pending.popleft().get():
+                yield ReplayResult(index, *result)
+                index += 1
+
+
+# ---------------------------BENCHMARK-------------------------#
+
+def random_game(generator, plies):
+    '''
+    Makes up a game by playing random legal moves, passes included, until it is won or has the given length.
+
+    Receives: a random.Random and the most moves to play
+    Returns: the game's moves as a transcript string
+    '''
+
+    game = JanggiGame()
+
+    for ply in range(plies):
+        if game.get_game_state() != "UNFINISHED":
+            break
+
+        move_from, move_to = generator.choice(game.legal_moves(game.get_players_turn()))
+        game.play_move(move_from, move_to)
+
+    return format_transcript(game.get_move_history())
+
+
+def main(argv=None):
+    '''
+    The command line entry point. Replays the games in a file and prints a summary, or without a file makes up
+    random games and prints the games a second for 1 worker and for the number of workers asked for.
+
+    Receives: the command line arguments, the ones the program was run with if none
+    Returns: 0, or 1 if a game in the file had a refused move
+    '''
+
+    parser = argparse.ArgumentParser(description="Replay stored JanggiGame games with a pool of processes.")
+    parser.add_argument("file", nargs="?", help="file with one game per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="games sent to a worker at once (default 64)")
+    parser.add_argument("--games", type=int, default=400, help="random games to make up without a file")
+    parser.add_argument("--plies", type=int, default=80, help="longest random game (default 80)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random games (default 0)")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        with open(args.file) as lines:
+            games = (line for line in lines if line.strip())
+            counts = {}
+            refused = 0
+            start = time.perf_counter()
+
+            for result in replay_games(games, args.workers, args.chunk_size):
+                counts[result.game_state] = counts.get(result.game_state, 0) + 1
+
+                if result.first_illegal is not None:
+                    refused += 1
+                    print("game %d: move %d refused, %s" % (result.index + 1, result.first_illegal + 1,
+                                                            result.reason))
+
+        seconds = time.perf_counter() - start
+        total = sum(counts.values())
+
+        print("%d games in %.2f s (%.0f games/s), %d with a refused move" % (total, seconds, total / seconds,
+                                                                              refused))
+        print(", ".join(state + " " + str(count) for state, count in sorted(counts.items())))
+
+        return 1 if refused else 0
+
+    generator = random.Random(args.seed)
+    games = [random_game(generator, args.plies) for game in range(args.games)]
+    plies = sum(len(game.split()) // 2 for game in games)
+    baseline = None
+    expected = None
+
+    for workers in sorted({1, args.workers}):
+        start = time.perf_counter()
+        results = list(replay_games(games, workers, args.chunk_size))
+        seconds = time.perf_counter() - start
+
+        if expected is None:
+            expected = results
+            baseline = seconds
+        elif results != expected:
+            print("results differ with %d workers" % workers)
+            return 1
+
+        print("%2d workers  %d games  %d plies  %.2f s  %8.0f games/s  %8.0f plies/s  speedup %.2fx"
+              % (workers, len(games), plies, seconds, len(games) / seconds, plies / seconds, baseline / seconds))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,814 @@
+# -----------------------------------------------------------------#
+# Description: Search for JanggiGame positions. Has a fixed size transposition table that stores what was learned
+#              about a position (depth searched, score, bound type and best move) under the position's zobrist hash,
+#              and an alpha-beta engine that searches a game in process, deepening one move at a time until a depth,
+#              node or time budget runs out, and gives back the best move found. A parallel engine runs the same
+#              search in several worker processes that share one transposition table in shared memory.
+#
+#              Run with: python JanggiSearch.py [--position POSITION] [--depth N] [--nodes N] [--seconds S]
+#                                               [--workers N]
+#              With more than 1 worker the search is timed with 1 worker process and then with N, to show the speedup.
+# -----------------------------------------------------------------#
+
+import argparse
+import os
+import sys
+import time
+from array import array
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from JanggiGame import JanggiGame, PIECE_NAMES, PIECE_VALUES, COORDS, START_POSITION, MOVE_CAPTURE, MOVE_PASS, \
+    MOVE_TO_SHIFT, MOVE_SQUARE_MASK, encode_move, move_to_string, opposite
+
+# ---------------------------TRANSPOSITION TABLE-------------------------#
+
+# bound types stored with a score. 0 is left for empty slots.
+EXACT = 1
+LOWER_BOUND = 2
+UPPER_BOUND = 3
+
+# each slot is two 64 bit words, the key xored with the data and the data. a slot only counts as a hit when
+# check ^ data gives back the key, so a slot that was half written by another process is just a miss.
+# the data word holds, from the low bits up, the move (16 bits), score (32 bits), depth (8 bits), bound (2 bits)
+# and the age of the search that stored it (6 bits).
+_WORDS_PER_SLOT = 2
+_SLOTS_PER_BUCKET = 2
+_BUCKET_BYTES = 8 * _WORDS_PER_SLOT * _SLOTS_PER_BUCKET
+
+_SCORE_OFFSET = 1 << 31
+_MAX_AGE = 63
+
+
+def table_bytes(size_mb):
+    '''
+    Returns the number of bytes a TranspositionTable of a size in megabytes allocates, the largest power of two
+    number of buckets that fits.
+    '''
+
+    bucket_count = 1
+
+    while bucket_count * 2 * _BUCKET_BYTES <= size_mb * 1024 * 1024:
+        bucket_count *= 2
+
+    return bucket_count * _BUCKET_BYTES
+
+
+class TranspositionTable:
+    '''
+    A transposition table with a fixed amount of memory, set in megabytes when it is made. The memory is allocated
+    once up front and never grows.
+
+    Positions go into buckets of two slots by their hash. The first slot is depth preferred -- it is only replaced
+    by a search at least as deep, or once it is left over from an older search. The second slot is always replaced,
+    so recent positions are kept as well.
+    '''
+
+    def __init__(self, size_mb=16, buffer=None):
+        '''
+        The init method for the transposition table that allocates the slots.
+
+        Receives: the size of the table in megabytes, rounded down to a power of two number of buckets. Can also
+        receive a writable buffer to keep the table in instead of allocating one, in which case the size comes from
+        the buffer.
+
+        Returns: none
+        '''
+
+        if buffer is None:
+            buffer = bytearray(table_bytes(size_mb))
+
+        bucket_count = len(buffer) // _BUCKET_BYTES
+
+        if bucket_count == 0 or bucket_count & (bucket_count - 1):
+            raise ValueError("transposition table needs a power of two number of buckets")
+
+        self._bytes = memoryview(buffer).cast('B')
+        self._table = self._bytes.cast('Q')
+        self._mask = bucket_count - 1
+        self._age = 0
+
+    def get_size(self):
+        '''
+        Get method for the number of positions the table can hold.
+
+        Receives: none
+        Returns: the number of slots
+        '''
+
+        return (self._mask + 1) * _SLOTS_PER_BUCKET
+
+    def new_search(self):
+        '''
+        Marks the start of a new search, so entries left over from earlier searches can be replaced first.
+
+        Receives: none
+        Returns: none
+        '''
+
+        self._age = (self._age + 1) & _MAX_AGE
+
+    def clear(self):
+        '''
+        Empties every slot of the table.
+
+        Receives: none
+        Returns: none
+        '''
+
+        self._bytes[:] = bytes(len(self._bytes))
+        self._age = 0
+
+    def release(self):
+        '''
+        Lets go of the buffer the table is kept in, so a shared memory block it was given can be closed. The table
+        can not be used after.
+
+        Receives: none
+        Returns: none
+        '''
+
+        self._table.release()
+        self._bytes.release()
+
+    def probe(self, key):
+        '''
+        Looks up a position in the table.
+
+        Receives: the position's 64 bit zobrist hash
+        Returns: a tuple of depth, score, bound type and best move if the position is in the table, None if not
+        '''
+
+        table = self._table
+        index = (key & self._mask) * _WORDS_PER_SLOT * _SLOTS_PER_BUCKET
+
+        for slot in (index, index + _WORDS_PER_SLOT):
+            data = table[slot + 1]
+
+            if data and table[slot] ^ data == key:
+                return ((data >> 48) & 0xFF, ((data >> 16) & 0xFFFFFFFF) - _SCORE_OFFSET, (data >> 56) & 0x3,
+                        data & 0xFFFF)
+
+        return None
+
+    def store(self, key, depth, score, bound, move=0):
+        '''
+        Stores what a search found out about a position.
+
+        Receives: the position's 64 bit zobrist hash, the depth searched (0 to 255), the score, the bound type
+        (EXACT, LOWER_BOUND or UPPER_BOUND) and the best move packed with JanggiGame.encode_move, 0 for none.
+
+        Returns: none
+        '''
+
+        table = self._table
+        index = (key & self._mask) * _WORDS_PER_SLOT * _SLOTS_PER_BUCKET
+
+        data = (move & 0xFFFF) | ((score + _SCORE_OFFSET) & 0xFFFFFFFF) << 16 | (depth & 0xFF) << 48 | \
+            (bound & 0x3) << 56 | self._age << 58
+
+        old_data = table[index + 1]
+        old_key = table[index] ^ old_data
+
+        # the depth preferred slot takes the entry if it is empty, holds the same position, is from an older search
+        # or was searched no deeper
+        if not old_data or old_key == key or (old_data >> 58) != self._age or (old_data >> 48) & 0xFF <= depth:
+            table[index] = key ^ data
+            table[index + 1] = data
+            return
+
+        table[index + 2] = key ^ data
+        table[index + 3] = data
+
+
+# ---------------------------SEARCH-------------------------#
+
+# values of the piece being captured for ordering captures, with the general above everything
+_VICTIM_VALUES = (10000,) + PIECE_VALUES[1:]
+
+# a score of MATE - n means the side to move wins in n moves. scores this close to MATE are mates.
+MATE = 100000
+MAX_PLY = 64
+_MATE_BOUND = MATE - MAX_PLY
+_INFINITY = MATE + 1
+
+# score for each move a horse, elephant, chariot or cannon has
+MOBILITY_WEIGHT = 4
+
+# counting the moves costs far more than the rest of the evaluation, so a position whose score without mobility is
+# this far outside the search window is scored without it
+_LAZY_MARGIN = 200
+
+# how many nodes are searched between looks at the clock and the node budget
+_CHECK_EVERY = 1024
+
+# ordering keys above any history score, for the table's move, captures and the killer moves
+_TABLE_MOVE_ORDER = 1 << 30
+_CAPTURE_ORDER = 1 << 24
+_KILLER_ORDER = 1 << 23
+_HISTORY_LIMIT = 1 << 22
+
+# the result of a search, the best move packed with encode_move (0 if there are no moves), its score for the side
+# to move, the deepest depth searched to the end, the nodes searched and the time taken
+SearchResult = namedtuple("SearchResult", "move score depth nodes seconds nodes_per_second")
+
+
+class _SearchStopped(Exception):
+    '''
+    Raised inside the search when the node or time budget runs out.
+    '''
+
+
+def evaluate(board, color):
+    '''
+    Scores a position by material and piece squares, which the board keeps up to date as pieces move (see
+    JanggiGame.PIECE_SQUARE), and by the mobility of the pieces that move more than a step.
+
+    Receives: the board and the color to score it for
+    Returns: the color's score minus the other color's
+    '''
+
+    return board.get_score(color) + MOBILITY_WEIGHT * (board.get_mobility(color) - board.get_mobility(opposite(color)))
+
+
+def _score_to_table(score, ply):
+    '''
+    Mate scores count moves from the root, so they are stored counting from the position instead.
+    '''
+
+    if score >= _MATE_BOUND:
+        return score + ply
+
+    if score <= -_MATE_BOUND:
+        return score - ply
+
+    return score
+
+
+def _score_from_table(score, ply):
+    '''
+    Undoes _score_to_table for a position reached at the given ply.
+    '''
+
+    if score >= _MATE_BOUND:
+        return score - ply
+
+    if score <= -_MATE_BOUND:
+        return score + ply
+
+    return score
+
+
+class Engine:
+    '''
+    An alpha-beta engine. Searches with negamax and iterative deepening, one depth at a time, each depth using what
+    the one before stored in the transposition table. Moves are tried with the table's best move first, then
+    captures by the value of the piece taken and the piece taking it, then killer moves (quiet moves that cut off a
+    search at the same depth) and other quiet moves by their history score, and passes last. At the end of the depth
+    a quiescence search plays out captures so the score is not taken in the middle of a trade.
+
+    The game is searched in place with push_packed and pop_move and is left as it was.
+    '''
+
+    def __init__(self, table=None):
+        '''
+        The init method for the engine that sets up its tables.
+
+        Receives: a TranspositionTable as a default parameter, a new 16 MB one if none
+        Returns: none
+        '''
+
+        if table is None:
+            table = TranspositionTable()
+
+        self._table = table
+
+        # two killer moves for each ply, and a history score for each from and to square pair
+        self._killers = [[0, 0] for ply in range(MAX_PLY + 1)]
+        self._history = [0] * (1 << 2 * MOVE_TO_SHIFT)
+
+        # array('H') move buffers reused at each ply
+        self._buffers = [array('H') for ply in range(MAX_PLY + 1)]
+
+        self._game = None
+        self._board = None
+        self._nodes = 0
+        self._made = 0
+        self._root_move = 0
+        self._node_limit = None
+        self._deadline = None
+        self._stop = None
+        self._depth = 0
+
+    def get_table(self):
+        '''
+        Get method for the engine's transposition table.
+
+        Receives: none
+        Returns: the TranspositionTable
+        '''
+
+        return self._table
+
+    def search(self, game, depth=MAX_PLY, nodes=None, seconds=None, report=None, stop=None):
+        '''
+        Searches the game's position for the player whose turn it is. Deepens until the depth is reached, a mate is
+        found or the node or time budget runs out, and gives back the result of the deepest depth searched to the
+        end. Depth 1 is always searched to the end, so there is a move whatever the budget.
+
+        Receives: the game, and as default parameters the depth to stop at, the most nodes and seconds to spend, a
+        function that is called with a SearchResult each time a depth is finished and a function that returns True
+        when the search should stop early, which is asked as often as the clock
+        Returns: a SearchResult
+        '''
+
+        start = time.perf_counter()
+
+        self._game = game
+        self._board = game.get_board()
+        self._nodes = 0
+        self._made = 0
+        self._node_limit = nodes
+        self._deadline = None if seconds is None else start + seconds
+        self._stop = stop
+        self._next_check = _CHECK_EVERY
+        self._depth = 0
+
+        for killers in self._killers:
+            killers[0] = killers[1] = 0
+
+        # history from earlier searches still helps, but counts for less
+        history = self._history
+        for index in range(len(history)):
+            history[index] >>= 2
+
+        self._table.new_search()
+
+        best = SearchResult(0, 0, 0, 0, 0.0, 0.0)
+
+        if game.get_game_state() != "UNFINISHED":
+            return best
+
+        for current in range(1, min(depth, MAX_PLY) + 1):
+            self._depth = current
+
+            try:
+                score = self._negamax(current, -_INFINITY, _INFINITY, 0)
+
+            # takes back the moves the search was in the middle of
+            except _SearchStopped:
+                for made in range(self._made):
+                    game.pop_move()
+
+                break
+
+            seconds_taken = time.perf_counter() - start
+            best = SearchResult(self._root_move, score, current, self._nodes, seconds_taken,
+                                self._nodes / seconds_taken if seconds_taken else 0.0)
+
+            if report is not None:
+                report(best)
+
+            if abs(score) >= _MATE_BOUND:
+                break
+
+        seconds_taken = time.perf_counter() - start
+
+        return best._replace(nodes=self._nodes, seconds=seconds_taken,
+                             nodes_per_second=self._nodes / seconds_taken if seconds_taken else 0.0)
+
+    def _check_budget(self):
+        '''
+        Raises _SearchStopped if the node or time budget has run out, except while depth 1 is searched.
+        '''
+
+        self._next_check = self._nodes + _CHECK_EVERY
+
+        if self._depth == 1:
+            return
+
+        if self._node_limit is not None and self._nodes >= self._node_limit:
+            raise _SearchStopped()
+
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise _SearchStopped()
+
+        if self._stop is not None and self._stop():
+            raise _SearchStopped()
+
+    def _make(self, move, color):
+        '''
+        Makes a move, or takes it straight back if it leaves the mover's general in check.
+
+        Receives: the packed move and the color moving
+        Returns: True if the move was made
+        '''
+
+        self._game.push_packed(move)
+
+        if not move & MOVE_PASS and self._game.is_in_check(color):
+            self._game.pop_move()
+            return False
+
+        self._made += 1
+        return True
+
+    def _unmake(self):
+        '''
+        Takes back the last move made with _make.
+        '''
+
+        self._game.pop_move()
+        self._made -= 1
+
+    def _capture_order(self, move):
+        '''
+        Ordering key for a capture, the most valuable piece taken first and then the least valuable piece taking it.
+        '''
+
+        board = self._board
+        row_from, col_from = COORDS[move & MOVE_SQUARE_MASK]
+        row_to, col_to = COORDS[move >> MOVE_TO_SHIFT & MOVE_SQUARE_MASK]
+
+        return _CAPTURE_ORDER + _VICTIM_VALUES[board.get_piece(row_to, col_to).get_type()] * 8 - \
+            board.get_piece(row_from, col_from).get_type()
+
+    def _ordered_moves(self, color, ply, table_move):
+        '''
+        Every move of a player's pieces with a pass, in the order the search tries them. Moves that leave the
+        general in check are still in the list.
+
+        Receives: the color moving, the ply and the best move from the transposition table, 0 for none
+        Returns: a list of packed moves
+        '''
+
+        moves = self._board.generate_moves(color, self._buffers[ply])
+        killers = self._killers[ply]
+        history = self._history
+        keyed = []
+
+        for move in moves:
+            if move == table_move:
+                keyed.append((_TABLE_MOVE_ORDER, move))
+            elif move & MOVE_CAPTURE:
+                keyed.append((self._capture_order(move), move))
+            elif move == killers[0]:
+                keyed.append((_KILLER_ORDER + 1, move))
+            elif move == killers[1]:
+                keyed.append((_KILLER_ORDER, move))
+            else:
+                keyed.append((history[move & 0x3FFF], move))
+
+        keyed.sort(reverse=True)
+
+        general = self._board.get_bitboard(color, 'General')
+        pass_square = general.bit_length() - 1 if general else 0
+        pass_move = encode_move(pass_square, pass_square, MOVE_PASS)
+
+        if pass_move == table_move:
+            return [pass_move] + [move for key, move in keyed]
+
+        return [move for key, move in keyed] + [pass_move]
+
+    def _negamax(self, depth, alpha, beta, ply):
+        '''
+        Searches a position to a depth.
+
+        Receives: the depth left, the alpha and beta bounds and the number of moves made from the root
+        Returns: the score for the side to move
+        '''
+
+        self._nodes += 1
+
+        if self._nodes >= self._next_check:
+            self._check_budget()
+
+        if depth <= 0 or ply >= MAX_PLY:
+            return self._quiescence(alpha, beta, ply)
+
+        game = self._game
+        key = game.get_hash()
+        entry = self._table.probe(key)
+        table_move = 0
+
+        if entry is not None:
+            entry_depth, score, bound, table_move = entry
+
+            # the root always searches, so it has a move to give back
+            if ply and entry_depth >= depth:
+                score = _score_from_table(score, ply)
+
+                if bound == EXACT or (bound == LOWER_BOUND and score >= beta) or \
+                        (bound == UPPER_BOUND and score <= alpha):
+                    return score
+
+        color = game.get_players_turn()
+        other = opposite(color)
+        original_alpha = alpha
+        best_score = -_INFINITY
+        best_move = 0
+
+        for move in self._ordered_moves(color, ply, table_move):
+            if not self._make(move, color):
+                continue
+
+            if not move & MOVE_PASS and game.is_in_checkmate(other):
+                score = MATE - ply - 1
+            else:
+                score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+
+            self._unmake()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+
+                if ply == 0:
+                    self._root_move = move
+
+            if score > alpha:
+                alpha = score
+
+            if alpha >= beta:
+                # quiet moves that cut off are remembered for other positions at this ply and in general
+                if not move & (MOVE_CAPTURE | MOVE_PASS):
+                    killers = self._killers[ply]
+
+                    if killers[0] != move:
+                        killers[1] = killers[0]
+                        killers[0] = move
+
+                    index = move & 0x3FFF
+                    self._history[index] += depth * depth
+
+                    if self._history[index] >= _HISTORY_LIMIT:
+                        self._history = [score >> 1 for score in self._history]
+
+                break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+
+        self._table.store(key, depth, _score_to_table(best_score, ply), bound, best_move)
+
+        return best_score
+
+    def _quiescence(self, alpha, beta, ply):
+        '''
+        Searches only captures until the position is quiet, so the score is not taken in the middle of a trade. The
+        side to move can always stand on the score it has.
+
+        Receives: the alpha and beta bounds and the number of moves made from the root
+        Returns: the score for the side to move
+        '''
+
+        game = self._game
+        color = game.get_players_turn()
+        score = self._board.get_score(color)
+
+        if alpha - _LAZY_MARGIN < score < beta + _LAZY_MARGIN:
+            score = evaluate(self._board, color)
+
+        if score >= beta or ply >= MAX_PLY:
+            return score
+
+        if score > alpha:
+            alpha = score
+
+        moves = self._board.generate_moves(color, self._buffers[ply])
+        captures = [(self._capture_order(move), move) for move in moves if move & MOVE_CAPTURE]
+        captures.sort(reverse=True)
+
+        for key, move in captures:
+            # taking the general wins the game
+            if key >= _CAPTURE_ORDER + _VICTIM_VALUES[0] * 8 - len(PIECE_NAMES):
+                return MATE - ply - 1
+
+            if not self._make(move, color):
+                continue
+
+            self._nodes += 1
+
+            if self._nodes >= self._next_check:
+                self._check_budget()
+
+            score = -self._quiescence(-beta, -alpha, ply + 1)
+            self._unmake()
+
+            if score >= beta:
+                return score
+
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+
+# ---------------------------PARALLEL SEARCH-------------------------#
+
+# the shared memory block starts with this many bytes before the table, the first of which is set to stop the workers
+_SHARED_HEADER = 64
+
+# the worker process's view of the shared memory block and its engine, set up once when the worker starts
+_worker_memory = None
+_worker_engine = None
+
+
+def _start_worker(memory_name):
+    '''
+    Attaches a worker process to the shared memory block and makes its engine, with a table kept in the block.
+
+    Receives: the name of the shared memory block
+    Returns: none
+    '''
+
+    global _worker_memory, _worker_engine
+
+    _worker_memory = shared_memory.SharedMemory(memory_name)
+    _worker_engine = Engine(TranspositionTable(buffer=_worker_memory.buf[_SHARED_HEADER:]))
+
+
+def _worker_stopped():
+    '''
+    Returns True once the parent has set the stop byte of the shared memory block.
+    '''
+
+    return _worker_memory.buf[0] != 0
+
+
+def _search_worker(position, depth, nodes, seconds):
+    '''
+    Searches a position in a worker process.
+
+    Receives: the position string, the depth to stop at and the node and time budgets
+    Returns: a SearchResult
+    '''
+
+    return _worker_engine.search(JanggiGame.from_position(position), depth, nodes, seconds, stop=_worker_stopped)
+
+
+class ParallelEngine:
+    '''
+    Runs the engine in several worker processes at once, all searching the same position and sharing one
+    transposition table in a shared memory block (lazy SMP). What one worker stores the others find, so together they
+    reach a depth sooner than one worker alone. Half of the workers search one move deeper than asked, which spreads
+    them over different parts of the tree. The search ends when the first worker finishes, and the deepest result
+    comes back.
+
+    The pool and the table are kept between searches, so the workers start warm. Close the engine when done with
+    it, or use it in a with block, to free the shared memory.
+    '''
+
+    def __init__(self, workers=None, table_mb=16):
+        '''
+        The init method for the parallel engine that makes the shared table and starts the pool.
+
+        Receives: the number of worker processes as a default parameter, the number of CPUs if None, and the size of
+        the shared table in megabytes
+        Returns: none
+        '''
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers < 1:
+            raise ValueError("workers needs to be at least 1")
+
+        self._workers = workers
+        self._memory = shared_memory.SharedMemory(create=True, size=_SHARED_HEADER + table_bytes(table_mb))
+        self._memory.buf[:] = bytes(self._memory.size)
+        self._pool = ProcessPoolExecutor(workers, initializer=_start_worker, initargs=(self._memory.name,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def search(self, game, depth=MAX_PLY, nodes=None, seconds=None):
+        '''
+        Searches the game's position for the player whose turn it is with every worker.
+
+        Receives: the game, and as default parameters the depth to stop at and the most nodes (for each worker) and
+        seconds to spend
+        Returns: a SearchResult with the deepest worker's move, score and depth, and the nodes of all the workers
+        '''
+
+        # a finished game has no move to search for, and one won by capturing a general has no position the workers
+        # can read back
+        if game.get_game_state() != "UNFINISHED":
+            return SearchResult(0, 0, 0, 0, 0.0, 0.0)
+
+        start = time.perf_counter()
+        position = game.to_position()
+        self._memory.buf[0] = 0
+
+        futures = [self._pool.submit(_search_worker, position, min(depth + index % 2, MAX_PLY), nodes, seconds)
+                   for index in range(self._workers)]
+
+        # the first worker to finish stops the rest, which give back what they have so far
+        wait(futures, return_when=FIRST_COMPLETED)
+        self._memory.buf[0] = 1
+
+        results = [future.result() for future in futures]
+        seconds_taken = time.perf_counter() - start
+        total_nodes = sum(result.nodes for result in results)
+
+        best = max(results, key=lambda result: result.depth)
+
+        return best._replace(nodes=total_nodes, seconds=seconds_taken,
+                             nodes_per_second=total_nodes / seconds_taken if seconds_taken else 0.0)
+
+    def clear(self):
+        '''
+        Empties the shared table.
+
+        Receives: none
+        Returns: none
+        '''
+
+        self._memory.buf[_SHARED_HEADER:] = bytes(self._memory.size - _SHARED_HEADER)
+
+    def close(self):
+        '''
+        Stops the workers and frees the shared memory block. Does nothing if it is already closed.
+
+        Receives: none
+        Returns: none
+        '''
+
+        if self._pool is None:
+            return
+
+        self._pool.shutdown()
+        self._pool = None
+        self._memory.close()
+        self._memory.unlink()
+
+
+# ---------------------------COMMAND LINE-------------------------#
+
+def main(argv=None):
+    '''
+    The command line entry point. Searches a position and prints the best move, score, nodes and nodes a second
+    after each depth. With more than 1 worker, times the search with 1 worker process and then with the number
+    asked for, and prints the speedup.
+
+    Receives: the command line arguments, the ones the program was run with if none
+    Returns: 0
+    '''
+
+    parser = argparse.ArgumentParser(description="Search a JanggiGame position with the alpha-beta engine.")
+    parser.add_argument("--position", default=START_POSITION, help="position string (default the starting position)")
+    parser.add_argument("--depth", type=int, default=4, help="depth to search to (default 4)")
+    parser.add_argument("--nodes", type=int, help="most nodes to search")
+    parser.add_argument("--seconds", type=float, help="most seconds to search")
+    parser.add_argument("--table-mb", type=int, default=16, help="transposition table size (default 16)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to search with (default 1)")
+    args = parser.parse_args(argv)
+
+    game = JanggiGame.from_position(args.position)
+
+    def report(result):
+        print("depth %2d  score %7d  move %-8s  nodes %9d  %8.3f s  %8.0f nodes/s"
+              % (result.depth, result.score, move_to_string(result.move), result.nodes, result.seconds,
+                 result.nodes_per_second))
+
+    if args.workers == 1:
+        engine = Engine(TranspositionTable(args.table_mb))
+        result = engine.search(game, args.depth, args.nodes, args.seconds, report)
+
+        print("best move " + move_to_string(result.move) + ", depth " + str(result.depth) + ", " +
+              str(result.nodes) + " nodes in %.3f s" % result.seconds)
+
+        return 0
+
+    baseline = None
+
+    for workers in (1, args.workers):
+        with ParallelEngine(workers, args.table_mb) as engine:
+            # a depth 1 search first starts the worker processes, so only the search itself is timed
+            engine.search(game, 1)
+            engine.clear()
+
+            result = engine.search(game, args.depth, args.nodes, args.seconds)
+
+        if baseline is None:
+            baseline = result.seconds
+
+        print("%2d workers  depth %2d  score %7d  move %-8s  nodes %9d  %8.3f s  %8.0f nodes/s  speedup %.2fx"
+              % (workers, result.depth, result.score, move_to_string(result.move), result.nodes, result.seconds,
+                 result.nodes_per_second, baseline / result.seconds))
+
+    print("%d CPUs" % (os.cpu_count() or 1))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,523 @@
+# -----------------------------------------------------------------#
+# Description: An asyncio server that hosts many JanggiGame games in one process. Clients connect over TCP or a unix
+#              socket and send one JSON object per line, and get one JSON object per line back. Moves, which test for
+#              checkmate, and listing legal moves run on a thread and engine analysis in a process pool, so slow
+#              requests do not hold up the others.
+#
+#              Requests have an "op" and, for an existing game, its "game" number. An "id" is echoed back.
+#                {"op": "create"}                              a new game, or {"op": "create", "position": ...}
+#                {"op": "move", "game": 1, "from": "c7", "to": "c6"}
+#                {"op": "pass", "game": 1}                     the player to move passes
+#                {"op": "state", "game": 1}                    game state, turn, position and check
+#                {"op": "legal", "game": 1}                    the legal moves of the player to move
+#                {"op": "resign", "game": 1}                   the player to move resigns, or give a "color"
+#                {"op": "analyze", "game": 1, "depth": 3}      the engine's move, "nodes" and "seconds" limits too,
+#                                                              capped at ANALYZE_MAX_DEPTH and ANALYZE_MAX_SECONDS
+#                {"op": "close", "game": 1}                    forgets the game
+#              Responses have "ok", true or false with an "error".
+#
+#              Run with: python JanggiServer.py [--host HOST] [--port N | --unix PATH]
+#                        python JanggiServer.py --load-test [--clients N] [--moves N] [--unix PATH] to time many clients
+#                        at once against a server started in the same process.
+# -----------------------------------------------------------------#
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from JanggiGame import JanggiGame, MOVE_PASS, encode_move, move_to_algebraic
+from JanggiSearch import Engine, TranspositionTable
+
+# the analysis engine of a process pool worker, made on its first request
+_engine = None
+
+# the deepest and longest an analyze request may search, so no client can hold an analysis process for long. a request
+# without a seconds limit gets the longest.
+ANALYZE_MAX_DEPTH = 8
+ANALYZE_MAX_SECONDS = 10.0
+
+
+def _analyze(position, depth, nodes, seconds):
+    '''
+    Searches a position in a process pool worker.
+
+    Receives: the position string, the depth to stop at and the node and time budgets
+    Returns: a tuple of the move as (move_from, move_to) strings, the score, the depth reached and the nodes
+    '''
+
+    global _engine
+
+    if _engine is None:
+        _engine = Engine(TranspositionTable(4))
+
+    result = _engine.search(JanggiGame.from_position(position), depth, nodes, seconds)
+
+    return move_to_algebraic(result.move), result.score, result.depth, result.nodes
+
+
+class RequestError(Exception):
+    '''
+    Raised while handling a request that can not be carried out, with the message sent back to the client.
+    '''
+
+
+class GameServer:
+    '''
+    Holds the games being played and answers requests for them. Each game has a lock, so the requests for one game
+    are handled one at a time even when one is waiting on the thread or process pool, while other games go on.
+    '''
+
+    def __init__(self, analysis_workers=None):
+        '''
+        The init method for the server that starts with no games.
+
+        Receives: the number of processes for analysis as a default parameter, the number of CPUs if None. The pool
+        is only started on the first analyze request.
+        Returns: none
+        '''
+
+        # game number : (game, lock)
+        self._sessions = {}
+        self._next_game = 1
+        self._analysis_workers = analysis_workers or os.cpu_count() or 1
+        self._analysis_pool = None
+
+        self._ops = {"create": self._create, "move": self._move, "pass": self._pass, "state": self._state,
+                     "legal": self._legal, "resign": self._resign, "analyze": self._analyze, "close": self._close}
+
+    def get_game_count(self):
+        '''
+        Get method for the number of games being held.
+
+        Receives: none
+        Returns: the number of games
+        '''
+
+        return len(self._sessions)
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        '''
+        Starts listening for clients.
+
+        Receives: the host and port to listen on as default parameters, 0 for any free port, or the path of a unix
+        socket to listen on instead
+        Returns: the asyncio Server
+        '''
+
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_client, path)
+
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    def close(self):
+        '''
+        Stops the analysis processes, if they were started.
+
+        Receives: none
+        Returns: none
+        '''
+
+        if self._analysis_pool is not None:
+            self._analysis_pool.shutdown()
+            self._analysis_pool = None
+
+    async def handle_client(self, reader, writer):
+        '''
+        Answers a client's requests, one line at a time, until it disconnects.
+
+        Receives: the connection's StreamReader and StreamWriter
+        Returns: none
+        '''
+
+        try:
+            while True:
+                # a line longer than the reader's limit raises ValueError, and the rest of it can not be told apart
+                # from the next request, so the client is told and the connection closed
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(json.dumps({"ok": False, "error": "request line too long"}).encode() + b"\n")
+                    await writer.drain()
+                    break
+
+                if not line:
+                    break
+
+                if not line.strip():
+                    continue
+
+                response = await self.handle_line(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            writer.close()
+
+    async def handle_line(self, line):
+        '''
+        Answers one request line.
+
+        Receives: the line as bytes
+        Returns: the response as a dictionary
+        '''
+
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"ok": False, "error": "not JSON"}
+
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "a request is a JSON object"}
+
+        handler = self._ops.get(request.get("op"))
+
+        if handler is None:
+            response = {"ok": False, "error": "unknown op " + repr(request.get("op"))}
+        else:
+            try:
+                response = await handler(request)
+            except RequestError as error:
+                response = {"ok": False, "error": str(error)}
+            except Exception as error:
+                # anything else is a bug in the server, but it only fails this request and not the connection
+                response = {"ok": False, "error": "internal error: " + type(error).__name__ + ": " + str(error)}
+
+        if "id" in request:
+            response["id"] = request["id"]
+
+        return response
+
+    def _session(self, request):
+        '''
+        Looks up the game a request is for.
+
+        Receives: the request
+        Returns: a tuple of the game and its lock
+        '''
+
+        game_number = request.get("game")
+        is_number = isinstance(game_number, int) and not isinstance(game_number, bool)
+        session = self._sessions.get(game_number) if is_number else None
+
+        if session is None:
+            raise RequestError("no game " + repr(request.get("game")))
+
+        return session
+
+    @staticmethod
+    def _number(request, name, default, kind, highest):
+        '''
+        Reads a number from a request, None if it is not given and default is None.
+
+        Receives: the request, the field's name, its default, int or float, and the highest value allowed
+        Returns: the number. Raises RequestError if it is not a finite number from 1 (above 0 for float) to highest.
+        '''
+
+        value = request.get(name, default)
+
+        if value is None:
+            return None
+
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise RequestError(name + " is a number")
+
+        value = kind(value)
+
+        if value <= 0 or value > highest:
+            raise RequestError(name + " is a number above 0 and at most " + str(highest))
+
+        return value
+
+    @staticmethod
+    def _describe(game):
+        '''
+        The state of a game as sent back in responses.
+        '''
+
+        color = game.get_players_turn()
+
+        return {"state": game.get_game_state(), "turn": color, "check": game.is_in_check(color)}
+
+    async def _create(self, request):
+        '''
+        Starts a game, from the starting setup or from a position string.
+        '''
+
+        game_number = self._next_game
+
+        if "position" in request:
+            try:
+                game = JanggiGame.from_position(request["position"])
+            except (ValueError, AttributeError) as error:
+                raise RequestError(str(error))
+        else:
+            game = JanggiGame()
+
+        self._next_game += 1
+        self._sessions[game_number] = (game, asyncio.Lock())
+
+        return dict(ok=True, game=game_number, **self._describe(game))
+
+    async def _move(self, request):
+        '''
+        Plays a move given as algebraic squares, answering with the MoveResult value.
+        '''
+
+        game, lock = self._session(request)
+
+        # the checkmate test after a move can take a while, so the move is made on a thread
+        async with lock:
+            result = await asyncio.get_running_loop().run_in_executor(None, game.play_move, str(request.get("from")),
+                                                                      str(request.get("to")))
+
+            return dict(ok=result.is_accepted(), result=result.value, **self._describe(game))
+
+    async def _pass(self, request):
+        '''
+        Passes the turn of the player to move.
+        '''
+
+        game, lock = self._session(request)
+
+        async with lock:
+            general = game.get_board().get_bitboard(game.get_players_turn(), 'General')
+            square = general.bit_length() - 1 if general else 0
+            result = await asyncio.get_running_loop().run_in_executor(None, game.play_packed,
+                                                                      encode_move(square, square, MOVE_PASS))
+
+            return dict(ok=result.is_accepted(), result=result.value, **self._describe(game))
+
+    async def _state(self, request):
+        '''
+        Answers with the game state, whose turn it is, whether they are in check and the position string.
+        '''
+
+        game, lock = self._session(request)
+
+        async with lock:
+            return dict(ok=True, position=game.to_position(), **self._describe(game))
+
+    async def _legal(self, request):
+        '''
+        Lists the legal moves of the player to move, worked out on a thread.
+        '''
+
+        game, lock = self._session(request)
+
+        async with lock:
+            moves = await asyncio.get_running_loop().run_in_executor(None, game.legal_moves,
+                                                                     game.get_players_turn())
+
+            return {"ok": True, "moves": moves}
+
+    async def _resign(self, request):
+        '''
+        Ends the game with the player to move, or the color given, resigning.
+        '''
+
+        game, lock = self._session(request)
+
+        # the player to move is read under the lock, since listing legal moves on a thread changes it while it tries
+        # each move
+        async with lock:
+            color = request.get("color", game.get_players_turn())
+
+            if color not in ("blue", "red"):
+                raise RequestError("color is blue or red")
+
+            return dict(ok=game.resign(color), **self._describe(game))
+
+    async def _analyze(self, request):
+        '''
+        Searches the game's position with the engine in the process pool.
+        '''
+
+        game, lock = self._session(request)
+
+        depth = self._number(request, "depth", 3, int, ANALYZE_MAX_DEPTH)
+        nodes = self._number(request, "nodes", None, int, sys.maxsize)
+        seconds = self._number(request, "seconds", ANALYZE_MAX_SECONDS, float, ANALYZE_MAX_SECONDS)
+
+        async with lock:
+            if game.get_game_state() != "UNFINISHED":
+                raise RequestError("the game is over")
+
+            position = game.to_position()
+
+        if self._analysis_pool is None:
+            self._analysis_pool = ProcessPoolExecutor(self._analysis_workers)
+
+        move, score, depth, nodes = await asyncio.get_running_loop().run_in_executor(
+            self._analysis_pool, _analyze, position, depth, nodes, seconds)
+
+        return {"ok": True, "move": list(move), "score": score, "depth": depth, "nodes": nodes}
+
+    async def _close(self, request):
+        '''
+        Forgets a game.
+        '''
+
+        game, lock = self._session(request)
+
+        # waits for the requests already made for the game to finish
+        async with lock:
+            if self._sessions.pop(request["game"], None) is None:
+                raise RequestError("no game " + repr(request["game"]))
+
+        return {"ok": True}
+
+
+# ---------------------------LOAD TEST-------------------------#
+
+async def _request(reader, writer, message, latencies):
+    '''
+    Sends one request and waits for its response, adding how long it took to the list of latencies.
+    '''
+
+    start = time.perf_counter()
+    writer.write(json.dumps(message).encode() + b"\n")
+    response = json.loads(await reader.readline())
+    latencies.append(time.perf_counter() - start)
+
+    return response
+
+
+async def _load_client(connect, moves, seed, latencies):
+    '''
+    One load test client, which creates a game, plays random legal moves in it, looks at its state now and then and
+    resigns at the end.
+
+    Receives: a function that opens a connection to the server, the most moves to play, a seed for the random moves
+    and a list to add each request's latency to
+    Returns: the number of requests made
+    '''
+
+    generator = random.Random(seed)
+    reader, writer = await connect()
+    game = (await _request(reader, writer, {"op": "create"}, latencies))["game"]
+    requests = 1
+
+    for move in range(moves):
+        legal = await _request(reader, writer, {"op": "legal", "game": game}, latencies)
+        requests += 1
+
+        if not legal["moves"]:
+            break
+
+        move_from, move_to = generator.choice(legal["moves"])
+        await _request(reader, writer, {"op": "move", "game": game, "from": move_from, "to": move_to}, latencies)
+        requests += 1
+
+        if move % 5 == 0:
+            await _request(reader, writer, {"op": "state", "game": game}, latencies)
+            requests += 1
+
+    await _request(reader, writer, {"op": "resign", "game": game}, latencies)
+    writer.close()
+
+    return requests + 1
+
+
+async def load_test(clients=200, moves=20, path=None, seed=0):
+    '''
+    Starts a server and connects many clients to it at once, each playing its own game, and times the requests.
+
+    Receives: as default parameters the number of clients, the moves each plays, the path of a unix socket to use
+    instead of TCP and the seed for the random moves
+    Returns: a dictionary of the games held, requests made, seconds taken and the median and 99th percentile request
+    latency in seconds
+    '''
+
+    server = GameServer()
+    listener = await server.start(path=path)
+
+    if path is not None:
+        connect = lambda: asyncio.open_unix_connection(path)
+    else:
+        port = listener.sockets[0].getsockname()[1]
+        connect = lambda: asyncio.open_connection("127.0.0.1", port)
+
+    latencies = []
+    start = time.perf_counter()
+
+    requests = await asyncio.gather(*[_load_client(connect, moves, seed + client, latencies)
+                                      for client in range(clients)])
+
+    seconds = time.perf_counter() - start
+    games = server.get_game_count()
+
+    listener.close()
+    await listener.wait_closed()
+    server.close()
+
+    latencies.sort()
+
+    return {"games": games, "requests": sum(requests), "seconds": seconds,
+            "median": latencies[len(latencies) // 2], "p99": latencies[int(len(latencies) * 0.99)]}
+
+
+# ---------------------------COMMAND LINE-------------------------#
+
+def main(argv=None):
+    '''
+    The command line entry point. Runs the server until it is stopped, or runs the load test and prints the
+    requests a second and latencies.
+
+    Receives: the command line arguments, the ones the program was run with if none
+    Returns: 0
+    '''
+
+    parser = argparse.ArgumentParser(description="Host JanggiGame games over a JSON lines protocol.")
+    parser.add_argument("--host", default="127.0.0.1", help="host to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (default 8765)")
+    parser.add_argument("--unix", help="path of a unix socket to listen on instead of a port")
+    parser.add_argument("--load-test", action="store_true", help="time many clients against a local server")
+    parser.add_argument("--clients", type=int, default=200, help="clients in the load test (default 200)")
+    parser.add_argument("--moves", type=int, default=20, help="moves each load test client plays (default 20)")
+    args = parser.parse_args(argv)
+
+    if args.load_test:
+        stats = asyncio.run(load_test(args.clients, args.moves, args.unix))
+
+        try:
+            import resource
+            memory = " max rss %d KB" % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        except ImportError:
+            memory = ""
+
+        print("%d clients, %d games, %d requests in %.2f s, %.0f requests/s, latency median %.2f ms p99 %.2f ms%s"
+              % (args.clients, stats["games"], stats["requests"], stats["seconds"],
+                 stats["requests"] / stats["seconds"], stats["median"] * 1000, stats["p99"] * 1000, memory))
+
+        return 0
+
+    async def serve():
+        server = GameServer()
+        listener = await server.start(args.host, args.port, args.unix)
+        print("listening on " + (args.unix or "%s:%d" % (args.host, args.port)))
+
+        try:
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+# -----------------------------------------------------------------#
+# Description: A store for many JanggiGame games that keeps only the recently played ones as live objects. A game
+#              left idle past a time limit, or pushed out when there are more live games than allowed, is frozen to a
+#              few hundred bytes with JanggiGame.freeze, and thawed again the next time it is asked for or moved in.
+#              Games are played through the store, or inside a pinned block that keeps the game from being frozen
+#              while it is held, so no move is made on a game object the store has already frozen.
+#
+#              Run with: python JanggiSessions.py [--games N] [--plies N] to compare the memory of live and frozen
+#              games and time freezing and thawing.
+# -----------------------------------------------------------------#
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from JanggiGame import JanggiGame, Board, parse_transcript
+
+
+class SessionStore:
+    '''
+    Holds games by number. Live games are kept in least recently used order with the time they were last used, so
+    the ones to freeze are always at the front and each access only looks at a few of them.
+    '''
+
+    def __init__(self, max_live=1000, idle_seconds=300.0, board_class=Board, clock=time.monotonic):
+        '''
+        The init method for the store that starts with no games.
+
+        Receives: as default parameters the most games kept live, the seconds a game can go unused before it is
+        frozen (None to never freeze for being idle), the board class games are thawed onto and the function giving
+        the time
+        Returns: none
+        '''
+
+        if max_live < 1:
+            raise ValueError("max_live needs to be at least 1")
+
+        self._max_live = max_live
+        self._idle_seconds = idle_seconds
+        self._board_class = board_class
+        self._clock = clock
+
+        # game number : (game, time last used), least recently used first
+        self._live = OrderedDict()
+
+        # game number : frozen bytes
+        self._frozen = {}
+
+        # game number : how many pinned blocks hold the game, for the games that can not be frozen right now
+        self._pinned = {}
+
+        self._next_game = 1
+
+    def __len__(self):
+        return len(self._live) + len(self._frozen)
+
+    def __contains__(self, game_number):
+        return game_number in self._live or game_number in self._frozen
+
+    def add(self, game=None):
+        '''
+        Adds a game to the store. The store owns the game from then on, so it is played through make_move,
+        play_move or pinned, not through the object passed in.
+
+        Receives: the game as a default parameter, a new one if None
+        Returns: the game's number
+        '''
+
+        if game is None:
+            game = JanggiGame(self._board_class)
+
+        game_number = self._next_game
+        self._next_game += 1
+
+        self._live[game_number] = (game, self._clock())
+        self._hibernate()
+
+        return game_number
+
+    @contextmanager
+    def pinned(self, game_number):
+        '''
+        Gets a game to play for the length of a with block, thawing it if it was frozen. The game is not frozen while
+        the block holds it, however many other games are added or used, and is marked as just used when the block
+        ends. The game object is not to be kept past the block, since the store may freeze it then.
+
+            with store.pinned(game_number) as game:
+                game.make_move('c7', 'c6')
+
+        Receives: the game's number. Raises KeyError if there is no such game.
+        Returns: a context manager giving the game
+        '''
+
+        game = self._thaw(game_number)
+        self._pinned[game_number] = self._pinned.get(game_number, 0) + 1
+
+        try:
+            yield game
+        finally:
+            if self._pinned[game_number] == 1:
+                del self._pinned[game_number]
+            else:
+                self._pinned[game_number] -= 1
+
+            if game_number in self._live:
+                self._live[game_number] = (game, self._clock())
+                self._live.move_to_end(game_number)
+
+            self._hibernate()
+
+    def make_move(self, game_number, move_from, move_to):
+        '''
+        Makes a move in a game, thawing it first if it was frozen.
+
+        Receives: the game's number and the move as for JanggiGame.make_move
+        Returns: True or False as make_move does
+        '''
+
+        return self._thaw(game_number).make_move(move_from, move_to)
+
+    def play_move(self, game_number, move_from, move_to):
+        '''
+        The same as make_move, but returns the MoveResult as JanggiGame.play_move does.
+        '''
+
+        return self._thaw(game_number).play_move(move_from, move_to)
+
+    def _thaw(self, game_number):
+        '''
+        Gets a game, thawing it if it was frozen, and marks it as just used. The game is only used before the store
+        is asked for anything else, which could freeze it.
+        '''
+
+        session = self._live.pop(game_number, None)
+
+        if session is not None:
+            game = session[0]
+        else:
+            game = JanggiGame.thaw(self._frozen.pop(game_number), self._board_class)
+
+        self._live[game_number] = (game, self._clock())
+        self._hibernate(game_number)
+
+        return game
+
+    def remove(self, game_number):
+        '''
+        Takes a game out of the store.
+
+        Receives: the game's number. Raises KeyError if there is no such game.
+        Returns: none
+        '''
+
+        if self._live.pop(game_number, None) is None:
+            del self._frozen[game_number]
+
+    def freeze(self, game_number):
+        '''
+        Freezes a live game now instead of waiting for it to go idle. Does nothing if it is already frozen.
+
+        Receives: the game's number. Raises KeyError if there is no such game, and ValueError if a pinned block holds
+        it or it can not be frozen, leaving it live.
+        Returns: none
+        '''
+
+        if game_number in self._frozen:
+            return
+
+        if game_number in self._pinned:
+            raise ValueError("game " + str(game_number) + " is pinned")
+
+        game, last_used = self._live[game_number]
+        self._frozen[game_number] = game.freeze()
+        del self._live[game_number]
+
+    def hibernate_idle(self):
+        '''
+        Freezes every game that has gone unused past the idle time. The store also does this on every add and get,
+        so this is only needed to free memory while no games are being played.
+
+        Receives: none
+        Returns: none
+        '''
+
+        self._hibernate()
+
+    def _hibernate(self, keep=None):
+        '''
+        Freezes the least recently used live games while there are more than max_live, and those idle past the idle
+        time, but never the game numbered keep or a pinned game. Pinned games found at the front are moved to the
+        back, as they are in use, and can leave more than max_live games live until they are let go. A game freeze
+        refuses is moved to the back the same way and stays live.
+        '''
+
+        live = self._live
+        oldest_allowed = None if self._idle_seconds is None else self._clock() - self._idle_seconds
+        skipped = 0
+
+        while skipped < len(live):
+            game_number, (game, last_used) = next(iter(live.items()))
+
+            if game_number == keep:
+                break
+
+            if len(live) <= self._max_live and (oldest_allowed is None or last_used >= oldest_allowed):
+                break
+
+            if game_number in self._pinned:
+                live.move_to_end(game_number)
+                skipped += 1
+                continue
+
+            try:
+                self._frozen[game_number] = game.freeze()
+            except ValueError:
+                live.move_to_end(game_number)
+                skipped += 1
+                continue
+
+            del live[game_number]
+
+    def get_stats(self):
+        '''
+        Get method for how many games are live and frozen and the bytes the frozen ones take.
+
+        Receives: none
+        Returns: a dictionary with live, frozen and frozen_bytes
+        '''
+
+        return {"live": len(self._live), "frozen": len(self._frozen),
+                "frozen_bytes": sum(len(frozen) for frozen in self._frozen.values())}
+
+
+# ---------------------------BENCHMARK-------------------------#
+
+def _position(store, game_number):
+    '''
+    Returns the position string of a game in the store.
+    '''
+
+    with store.pinned(game_number) as game:
+        return game.to_position()
+
+
+def main(argv=None):
+    '''
+    The command line entry point. Fills a store with random games, measures the memory they take live and frozen
+    with tracemalloc, and times freezing and thawing.
+
+    Receives: the command line arguments, the ones the program was run with if none
+    Returns: 0, or 1 if a thawed game differs from the one frozen
+    '''
+
+    from JanggiReplay import random_game
+
+    parser = argparse.ArgumentParser(description="Compare the memory of live and frozen JanggiGame games.")
+    parser.add_argument("--games", type=int, default=2000, help="games to hold (default 2000)")
+    parser.add_argument("--plies", type=int, default=60, help="longest random game (default 60)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random games (default 0)")
+    args = parser.parse_args(argv)
+
+    generator = random.Random(args.seed)
+    transcripts = [parse_transcript(random_game(generator, args.plies)) for game in range(args.games)]
+
+    # the memory is measured with tracemalloc on, and the times after, since tracing slows everything down
+    tracemalloc.start()
+
+    store = SessionStore(max_live=args.games, idle_seconds=None)
+    base = tracemalloc.get_traced_memory()[0]
+
+    for moves in transcripts:
+        game = JanggiGame()
+
+        for move in moves:
+            game.play_packed(move)
+
+        store.add(game)
+
+    live_bytes = tracemalloc.get_traced_memory()[0] - base
+
+    for game_number in range(1, args.games + 1):
+        store.freeze(game_number)
+
+    frozen_bytes = tracemalloc.get_traced_memory()[0] - base
+
+    tracemalloc.stop()
+
+    positions = [_position(store, game_number) for game_number in range(1, args.games + 1)]
+
+    start = time.perf_counter()
+
+    for game_number in range(1, args.games + 1):
+        store.freeze(game_number)
+
+    freeze_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    for game_number in range(1, args.games + 1):
+        with store.pinned(game_number):
+            pass
+
+    thaw_seconds = time.perf_counter() - start
+
+    thawed = [_position(store, game_number) for game_number in range(1, args.games + 1)]
+
+    print("%d games, %.1f plies on average" % (args.games, sum(len(moves) for moves in transcripts) / args.games))
+    print("live    %10d bytes  %7.0f bytes/game" % (live_bytes, live_bytes / args.games))
+    print("frozen  %10d bytes  %7.0f bytes/game  %.1fx smaller" % (frozen_bytes, frozen_bytes / args.games,
+                                                                    live_bytes / frozen_bytes))
+    print("freeze %.1f us/game, thaw %.1f us/game" % (freeze_seconds / args.games * 1e6,
+                                                      thaw_seconds / args.games * 1e6))
+
+    if thawed != positions:
+        print("thawed games differ from the ones frozen")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
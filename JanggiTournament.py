@@ -0,0 +1,295 @@
+# -----------------------------------------------------------------#
+# Description: Plays games between two players, with JanggiGame as the referee, spread over a pool of worker
+#              processes. A player is the engine with a depth, node or time limit for each move, or a baseline that
+#              plays random moves or the move that scores best right away. Each game starts with a few random moves
+#              so no two games are the same, and the players swap colors from one game to the next. Results come back
+#              as each game ends.
+#
+#              Run with: python JanggiTournament.py PLAYER PLAYER [--games N] [--workers N] [--opening-plies N]
+#                                                   [--max-plies N] [--seed N]
+#              A player is 'random', 'greedy' or 'engine' with limits after a colon, such as 'engine:depth=3' or
+#              'engine:nodes=2000,seconds=0.5'.
+# -----------------------------------------------------------------#
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+
+from JanggiGame import JanggiGame, MOVE_PASS, move_from_algebraic, opposite
+from JanggiSearch import Engine, TranspositionTable
+
+# a player, its spec as given and its kind, 'random', 'greedy' or 'engine', with the engine's limits for each move,
+# None for no limit
+Player = namedtuple("Player", "spec kind depth nodes seconds")
+
+# the result of one game. first_color is the color the first player had, winner is 'blue', 'red' or None for a
+# draw, and nodes and seconds are what the engine players spent, for nodes a second.
+GameResult = namedtuple("GameResult", "index first_color winner plies reason nodes seconds worker")
+
+KINDS = ("random", "greedy", "engine")
+
+# the size of each engine player's transposition table in a worker, in megabytes
+TABLE_MB = 4
+
+
+def parse_player(spec):
+    '''
+    Reads a player from its spec, 'random', 'greedy' or 'engine' with limits such as 'engine:depth=3,nodes=2000'.
+
+    Receives: the spec string. Raises ValueError if it is not a player.
+    Returns: a Player
+    '''
+
+    kind, colon, options = spec.partition(":")
+    limits = {"depth": None, "nodes": None, "seconds": None}
+
+    if kind not in KINDS:
+        raise ValueError("unknown player " + repr(kind) + ", use one of " + ", ".join(KINDS))
+
+    for option in filter(None, options.split(",")):
+        name, equals, value = option.partition("=")
+
+        if name not in limits or not equals:
+            raise ValueError("unknown option " + repr(option) + " for " + kind)
+
+        try:
+            limits[name] = float(value) if name == "seconds" else int(value)
+        except ValueError:
+            raise ValueError(name + " for " + kind + " must be a number, not " + repr(value))
+
+        # a limit of 0 or less would stop the search before it starts, or, for depth, read as no limit at all
+        if not limits[name] > 0:
+            raise ValueError(name + " for " + kind + " must be above 0, not " + value)
+
+    if kind == "engine" and limits["depth"] is None and limits["nodes"] is None and limits["seconds"] is None:
+        limits["depth"] = 2
+
+    return Player(spec, kind, limits["depth"], limits["nodes"], limits["seconds"])
+
+
+# ---------------------------PLAYING-------------------------#
+
+# each worker process's engines by (color, player spec), made the first time the player is seen with that color, so
+# the two sides of a game between the same players do not share a table
+_engines = {}
+
+
+def _packed_legal_moves(game):
+    '''
+    Returns the legal moves of the player to move as packed integers.
+    '''
+
+    return [move_from_algebraic(move_from, move_to)
+            for move_from, move_to in game.legal_moves(game.get_players_turn())]
+
+
+def choose_move(player, game, generator):
+    '''
+    Picks a player's move.
+
+    Receives: the Player, the game and a random.Random for the random and greedy players' choices
+    Returns: a tuple of the packed move and the nodes the engine searched, 0 for the baselines
+    '''
+
+    if player.kind == "random":
+        return generator.choice(_packed_legal_moves(game)), 0
+
+    # the greedy player makes each move and keeps the one with the best material and piece square score after it,
+    # a random one among equals
+    if player.kind == "greedy":
+        color = game.get_players_turn()
+        board = game.get_board()
+        best_score = None
+        best_moves = []
+
+        for move in _packed_legal_moves(game):
+            game.push_packed(move)
+            score = board.get_score(color)
+            game.pop_move()
+
+            if best_score is None or score > best_score:
+                best_score = score
+                best_moves = [move]
+            elif score == best_score:
+                best_moves.append(move)
+
+        return generator.choice(best_moves), 0
+
+    key = (game.get_players_turn(), player.spec)
+    engine = _engines.get(key)
+
+    if engine is None:
+        engine = Engine(TranspositionTable(TABLE_MB))
+        _engines[key] = engine
+
+    result = engine.search(game, 64 if player.depth is None else player.depth, player.nodes, player.seconds)
+
+    return result.move, result.nodes
+
+
+def play_game(index, first, second, opening_plies=4, max_plies=200, seed=0):
+    '''
+    Plays one game. The first player has blue, which moves first, in even numbered games and red in odd numbered
+    ones. A move the referee refuses loses the game, and a game still going after max_plies moves is a draw.
+
+    Receives: the game's number, the two Players, and as default parameters the number of random moves to start
+    with, the most moves to play and the seed for the random choices (added to the game's number)
+    Returns: a GameResult
+    '''
+
+    generator = random.Random(seed + index)
+    first_color = 'blue' if index % 2 == 0 else 'red'
+    players = {first_color: first, opposite(first_color): second}
+
+    # the engine's tables start empty every game so games do not depend on what a worker played before
+    for engine in _engines.values():
+        engine.get_table().clear()
+
+    game = JanggiGame()
+    nodes = 0
+    seconds = 0.0
+    plies = 0
+
+    # the random opening, piece moves only
+    while plies < opening_plies and game.get_game_state() == "UNFINISHED":
+        moves = [move for move in _packed_legal_moves(game) if not move & MOVE_PASS]
+        game.play_packed(generator.choice(moves))
+        plies += 1
+
+    while plies < max_plies and game.get_game_state() == "UNFINISHED":
+        color = game.get_players_turn()
+        start = time.perf_counter()
+        move, searched = choose_move(players[color], game, generator)
+
+        if players[color].kind == "engine":
+            nodes += searched
+            seconds += time.perf_counter() - start
+
+        result = game.play_packed(move)
+
+        if not result.is_accepted():
+            return GameResult(index, first_color, opposite(color), plies, color + " " + result.value, nodes, seconds,
+                              os.getpid())
+
+        plies += 1
+
+    state = game.get_game_state()
+
+    if state == "BLUE_WON":
+        return GameResult(index, first_color, 'blue', plies, "checkmate", nodes, seconds, os.getpid())
+
+    if state == "RED_WON":
+        return GameResult(index, first_color, 'red', plies, "checkmate", nodes, seconds, os.getpid())
+
+    return GameResult(index, first_color, None, plies, "move limit", nodes, seconds, os.getpid())
+
+
+def _play_task(task):
+    '''
+    Plays a game in a worker process from a tuple of play_game's arguments.
+    '''
+
+    return play_game(*task)
+
+
+def play_match(first, second, games, workers=None, opening_plies=4, max_plies=200, seed=0):
+    '''
+    Plays a match of games between two players, spread over a pool of worker processes.
+
+    Receives: the two Players and the number of games, and as default parameters the number of worker processes
+    (the number of CPUs if None, and no pool at all for 1) and play_game's options
+    Returns: a generator of GameResult, in the order the games end
+    '''
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers < 1:
+        raise ValueError("workers needs to be at least 1")
+
+    tasks = ((index, first, second, opening_plies, max_plies, seed) for index in range(games))
+
+    if workers == 1:
+        for task in tasks:
+            yield _play_task(task)
+
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(_play_task, tasks):
+            yield result
+
+
+# ---------------------------COMMAND LINE-------------------------#
+
+def main(argv=None):
+    '''
+    The command line entry point. Plays a match and prints each game as it ends with the running score, then the
+    totals and the nodes a second of each worker.
+
+    Receives: the command line arguments, the ones the program was run with if none
+    Returns: 0, or 2 if a player spec is wrong
+    '''
+
+    parser = argparse.ArgumentParser(description="Play games between JanggiGame players over a process pool.")
+    parser.add_argument("first", help="first player, such as engine:depth=2")
+    parser.add_argument("second", help="second player, such as greedy")
+    parser.add_argument("--games", type=int, default=20, help="games to play (default 20)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default CPUs)")
+    parser.add_argument("--opening-plies", type=int, default=4, help="random moves to start each game (default 4)")
+    parser.add_argument("--max-plies", type=int, default=200, help="moves before a game is a draw (default 200)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random moves (default 0)")
+    args = parser.parse_args(argv)
+
+    try:
+        first = parse_player(args.first)
+        second = parse_player(args.second)
+    except ValueError as error:
+        print(error)
+        return 2
+
+    wins = losses = draws = 0
+    total_plies = 0
+    workers = {}
+    start = time.perf_counter()
+
+    for count, result in enumerate(play_match(first, second, args.games, args.workers, args.opening_plies,
+                                              args.max_plies, args.seed), 1):
+        if result.winner is None:
+            draws += 1
+            outcome = "draw"
+        elif result.winner == result.first_color:
+            wins += 1
+            outcome = first.spec + " won"
+        else:
+            losses += 1
+            outcome = second.spec + " won"
+
+        total_plies += result.plies
+
+        nodes, seconds = workers.get(result.worker, (0, 0.0))
+        workers[result.worker] = (nodes + result.nodes, seconds + result.seconds)
+
+        print("game %4d  %-5s %-28s %3d plies  %-12s  +%d -%d =%d"
+              % (result.index + 1, result.first_color, outcome, result.plies, result.reason, wins, losses, draws))
+
+    seconds = time.perf_counter() - start
+    games = wins + losses + draws
+
+    print("%s vs %s: +%d -%d =%d  score %.1f%%  average %.1f plies  %.1f s  %.2f games/s"
+          % (first.spec, second.spec, wins, losses, draws, 100.0 * (wins + draws / 2) / games if games else 0.0,
+             total_plies / games if games else 0.0, seconds, games / seconds))
+
+    for worker, (nodes, engine_seconds) in sorted(workers.items()):
+        if engine_seconds:
+            print("worker %d  %d nodes  %.0f nodes/s" % (worker, nodes, nodes / engine_seconds))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
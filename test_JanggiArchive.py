@@ -0,0 +1,93 @@
+import pytest
+
+from JanggiArchive import ArchiveWriter, ArchiveReader, _HEADER, _RECORD
+from JanggiGame import parse_transcript
+
+MOVES = parse_transcript("c7 c6, c1 d3, b10 d7, b1 d4")
+
+
+def _write(path, games=3):
+    '''
+    Writes an archive of games copies of the same game and returns its bytes.
+    '''
+
+    with ArchiveWriter(str(path)) as writer:
+        for index in range(games):
+            writer.write(MOVES, "BLUE_WON")
+
+    return path.read_bytes()
+
+
+def test_reads_back(tmp_path):
+    path = tmp_path / "games.bin"
+    _write(path)
+
+    with ArchiveReader(str(path)) as reader:
+        assert len(reader) == 3
+        assert list(reader.get_game(2).moves) == list(MOVES)
+        assert [record.game_state for record in reader] == ["BLUE_WON"] * 3
+
+
+def test_truncated_file_is_refused_on_open(tmp_path):
+    path = tmp_path / "games.bin"
+    path.write_bytes(_write(path)[:-5])
+
+    with pytest.raises(ValueError, match="cut short"):
+        ArchiveReader(str(path))
+
+
+def test_corrupt_result_is_a_value_error(tmp_path):
+    path = tmp_path / "games.bin"
+    data = bytearray(_write(path))
+    data[_HEADER.size + 2] = 200
+    path.write_bytes(bytes(data))
+
+    with ArchiveReader(str(path)) as reader:
+        with pytest.raises(ValueError, match="corrupt"):
+            reader.get_game(0)
+
+        with pytest.raises(ValueError, match="corrupt"):
+            list(reader)
+
+
+def test_corrupt_move_count_is_a_value_error(tmp_path):
+    path = tmp_path / "games.bin"
+    data = bytearray(_write(path))
+    _RECORD.pack_into(data, _HEADER.size + _RECORD.size + 2 * len(MOVES), 0xFFFF, 1)
+    path.write_bytes(bytes(data))
+
+    with ArchiveReader(str(path)) as reader:
+        assert reader.get_game(0).game_state == "BLUE_WON"
+
+        with pytest.raises(ValueError, match="corrupt"):
+            reader.get_game(1)
+
+        with pytest.raises(ValueError, match="corrupt"):
+            list(reader)
+
+
+def test_wrong_move_count_does_not_hide_later_games(tmp_path):
+    path = tmp_path / "games.bin"
+    data = bytearray(_write(path))
+    _RECORD.pack_into(data, _HEADER.size + _RECORD.size + 2 * len(MOVES), 2, 1)
+    path.write_bytes(bytes(data))
+
+    with ArchiveReader(str(path)) as reader:
+        records = list(reader)
+
+    assert len(records) == 3
+    assert list(records[2].moves) == list(MOVES)
+
+
+def test_unfinished_archive_cut_inside_a_record_is_refused(tmp_path):
+    path = tmp_path / "games.bin"
+    writer = ArchiveWriter(str(path))
+    writer.write(MOVES)
+    writer.write(MOVES)
+    writer._file.flush()
+    path.write_bytes(path.read_bytes()[:-3])
+
+    with pytest.raises(ValueError, match="runs past"):
+        ArchiveReader(str(path))
+
+    writer._file.close()
@@ -0,0 +1,31 @@
+from JanggiGame import JanggiGame
+
+
+def test_undo_does_not_take_back_a_resignation():
+    game = JanggiGame()
+    assert game.make_move('c7', 'c6')
+    assert game.resign('red')
+
+    assert not game.undo()
+    assert game.get_game_state() == "BLUE_WON"
+    assert len(game.get_move_history()) == 1
+
+
+def test_resignation_is_kept_through_freeze():
+    game = JanggiGame()
+    assert game.make_move('c7', 'c6')
+    assert game.resign('blue')
+
+    thawed = JanggiGame.thaw(game.freeze())
+
+    assert thawed.get_game_state() == "RED_WON"
+    assert not thawed.undo()
+
+
+def test_undo_takes_back_a_move_without_a_resignation():
+    game = JanggiGame()
+    assert game.make_move('c7', 'c6')
+
+    assert game.undo()
+    assert game.get_game_state() == "UNFINISHED"
+    assert len(game.get_move_history()) == 0
@@ -0,0 +1,61 @@
+import pytest
+
+from JanggiGame import JanggiGame, START_POSITION, MAX_TURN
+from JanggiSessions import SessionStore
+
+# more moves than the old 16 bit move count of a frozen game could hold
+MANY_MOVES = 0xFFFF + 3
+
+
+def _pass(game, times):
+    '''
+    Has the players pass in turn, times passes in all, starting with blue.
+    '''
+
+    for index in range(times):
+        general = "e9" if index % 2 == 0 else "e2"
+        assert game.make_move(general, general)
+
+    return game
+
+
+def test_freeze_more_than_0xffff_moves():
+    game = _pass(JanggiGame(), MANY_MOVES)
+    thawed = JanggiGame.thaw(game.freeze())
+
+    assert thawed.to_position() == game.to_position()
+
+    for index in range(MANY_MOVES):
+        assert thawed.undo()
+
+    assert not thawed.undo()
+    assert thawed.to_position() == START_POSITION
+
+
+def test_store_freezes_long_games():
+    store = SessionStore(max_live=1)
+    game_number = store.add(_pass(JanggiGame(), MANY_MOVES))
+    store.add()
+
+    assert game_number in store
+    assert store.get_stats()["frozen"] == 1
+
+    with store.pinned(game_number) as game:
+        assert game.to_position().endswith(" " + str(MANY_MOVES + 1))
+
+
+def test_store_keeps_a_game_freeze_refuses_live():
+    game = _pass(JanggiGame.from_position(START_POSITION.replace(" 1", " " + str(MAX_TURN - 1))), MANY_MOVES)
+    store = SessionStore(max_live=1)
+    game_number = store.add(game)
+
+    with pytest.raises(ValueError):
+        store.freeze(game_number)
+
+    # the store freezes the new game in its place
+    store.add()
+
+    assert game_number in store
+    assert store.get_stats()["live"] == 1
+    assert store.get_stats()["frozen"] == 1
+    assert store.make_move(game_number, "e2", "e2")
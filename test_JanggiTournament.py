@@ -0,0 +1,35 @@
+import pytest
+
+import JanggiTournament
+from JanggiGame import JanggiGame
+from JanggiTournament import parse_player, choose_move, play_game
+
+
+@pytest.mark.parametrize("spec", ["engine:depth=0", "engine:depth=-2", "engine:nodes=0", "engine:seconds=0",
+                                  "engine:seconds=-1.5"])
+def test_parse_player_refuses_limits_not_above_0(spec):
+    with pytest.raises(ValueError, match="must be above 0"):
+        parse_player(spec)
+
+
+@pytest.mark.parametrize("spec", ["engine:depth=x", "engine:nodes=1.5", "engine:seconds=soon"])
+def test_parse_player_names_the_option_it_can_not_read(spec):
+    with pytest.raises(ValueError, match=spec.split(":")[1].split("=")[0] + " for engine must be a number"):
+        parse_player(spec)
+
+
+def test_sides_of_a_mirror_match_have_their_own_engines():
+    player = parse_player("engine:depth=1")
+    game = JanggiGame()
+    JanggiTournament._engines.clear()
+
+    move, nodes = choose_move(player, game, None)
+    game.play_packed(move)
+    choose_move(player, game, None)
+
+    engines = JanggiTournament._engines
+    assert set(engines) == {("blue", player.spec), ("red", player.spec)}
+    assert engines[("blue", player.spec)] is not engines[("red", player.spec)]
+
+    result = play_game(0, player, player, max_plies=6)
+    assert result.plies <= 6